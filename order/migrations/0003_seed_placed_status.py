@@ -0,0 +1,20 @@
+# Generated by Django 3.1.6 on 2026-10-18 18:10
+
+from django.conf import settings
+from django.db import migrations
+
+
+def create_placed_status(apps, schema_editor):
+    Status = apps.get_model('order', 'Status')
+    Status.objects.using(schema_editor.connection.alias).get_or_create(status=settings.ORDER_PLACED_STATUS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order', '0002_auto_20210304_2146'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_placed_status, migrations.RunPython.noop),
+    ]
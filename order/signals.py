@@ -0,0 +1,59 @@
+from django.conf                 import settings
+from django.db.models.signals    import pre_save, post_save, post_delete
+from django.dispatch             import receiver
+
+from project.aggregates          import apply_funding
+from tumbluv.lookups             import statuses
+from project.models              import Gift
+from .models                     import Order, Status
+
+def get_funding(gift_id, status_id, donation):
+    if gift_id is None:
+        return None
+
+    if statuses.get_name(status_id) in settings.ORDER_CANCELED_STATUSES:
+        return None
+
+    project_id = Gift.objects.filter(id=gift_id).values_list('project_id', flat=True).first()
+
+    return (project_id, donation) if project_id else None
+
+def update_funding(previous, current):
+    if previous == current:
+        return
+
+    if previous:
+        apply_funding(previous[0], -previous[1], -1)
+
+    if current:
+        apply_funding(current[0], current[1], 1)
+
+@receiver(post_save, sender=Status)
+@receiver(post_delete, sender=Status)
+def expire_status_lookup(sender, **kwargs):
+    statuses.invalidate()
+
+@receiver(pre_save, sender=Order)
+def remember_funding(sender, instance, raw=False, **kwargs):
+    instance._previous_funding = None
+
+    if raw or instance.pk is None:
+        return
+
+    previous = Order.objects.filter(pk=instance.pk).values('gift_id', 'status_id', 'donation').first()
+    if previous:
+        instance._previous_funding = get_funding(previous['gift_id'], previous['status_id'], previous['donation'])
+
+@receiver(post_save, sender=Order)
+def save_funding(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+
+    update_funding(
+        getattr(instance, '_previous_funding', None),
+        get_funding(instance.gift_id, instance.status_id, instance.donation)
+    )
+
+@receiver(post_delete, sender=Order)
+def delete_funding(sender, instance, **kwargs):
+    update_funding(get_funding(instance.gift_id, instance.status_id, instance.donation), None)
@@ -1,3 +1,348 @@
-from django.test import TestCase
+import os
+import jwt
+import json
+import datetime
+import tempfile
+import threading
 
-# Create your tests here.
+from io                     import StringIO
+
+from decimal                import Decimal
+
+from unittest.mock          import patch
+
+from django.core.cache      import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db              import connection
+from django.test            import TestCase, TransactionTestCase, Client
+from django.utils           import timezone
+
+from my_settings            import SECRET_KEY, ALGORITHM
+from user.models            import User, IdempotencyKey
+from project.models         import Category, Project, Gift
+from .models                import Order, Status
+from .placement             import place_order
+
+class ProjectFundingTest(TestCase):
+
+    def setUp(self):
+        User.objects.create(
+            id       = 1,
+            fullname = '사용자1',
+            email    = 'email1'
+            )
+
+        Category.objects.create(
+            id   = 1,
+            name = '카테고리1'
+            )
+
+        Project.objects.create(
+            id            = 1,
+            user_id       = 1,
+            category_id   = 1,
+            name          = '프로젝트1',
+            opening_date  = datetime.datetime(2021, 1, 1, 0, 0),
+            closing_date  = datetime.datetime(2021, 1, 31, 0, 0),
+            thumbnail_url = '사진1',
+            goal_amount   = 100000.00,
+            summary       = '프로젝트요약1',
+            project_uri   = 'uri'
+            )
+
+        Gift.objects.create(
+            id            = 1,
+            project_id    = 1,
+            name          = '옵션1',
+            price         = 10000.00,
+            quantity_sold = 0,
+            stock         = 10
+            )
+
+        Status.objects.create(id=11, status='paid')
+        Status.objects.create(id=12, status='canceled')
+
+    def tearDown(self):
+        User.objects.all().delete()
+        Category.objects.all().delete()
+        Project.objects.all().delete()
+        Status.objects.filter(id__in=[11, 12]).delete()
+
+    def assertFunding(self, total_amount, total_supporters, achieved_rate):
+        project = Project.objects.get(id=1)
+
+        self.assertEqual(project.total_amount, Decimal(total_amount))
+        self.assertEqual(project.total_supporters, total_supporters)
+        self.assertEqual(project.achieved_rate, None if achieved_rate is None else Decimal(achieved_rate))
+
+    def test_order_create_and_cancel_update_funding(self):
+        first  = Order.objects.create(user_id=1, gift_id=1, donation=10000, status_id=11)
+        Order.objects.create(user_id=1, gift_id=1, donation=15000, status_id=11)
+        self.assertFunding('25000.00', 2, '25.00')
+
+        first.status_id = 12
+        first.save()
+        self.assertFunding('15000.00', 1, '15.00')
+
+        first.delete()
+        self.assertFunding('15000.00', 1, '15.00')
+
+    def test_rebuild_project_aggregates(self):
+        Order.objects.create(user_id=1, gift_id=1, donation=10000, status_id=11)
+        Order.objects.create(user_id=1, gift_id=1, donation=30000, status_id=12)
+        Project.objects.filter(id=1).update(total_amount=0, total_supporters=0, achieved_rate=0)
+
+        call_command('rebuild_project_aggregates', stdout=StringIO())
+
+        self.assertFunding('10000.00', 1, '10.00')
+
+    def test_funding_with_zero_goal_leaves_rate_empty(self):
+        Project.objects.filter(id=1).update(goal_amount=0)
+
+        Order.objects.create(user_id=1, gift_id=1, donation=10000, status_id=11)
+        self.assertFunding('10000.00', 1, None)
+
+        call_command('rebuild_project_aggregates', stdout=StringIO())
+        self.assertFunding('10000.00', 1, None)
+
+    def test_rebuild_keeps_funding_added_during_rebuild(self):
+        Order.objects.create(user_id=1, gift_id=1, donation=10000, status_id=11)
+        Project.objects.filter(id=1).update(total_amount=0, total_supporters=0, achieved_rate=0)
+
+        # 집계를 읽은 직후 새 후원이 들어와도 UPDATE 가 그 후원까지 다시 센다
+        original_filter = Project.objects.filter
+
+        def filter_with_pledge(*args, **kwargs):
+            if 'id__in' in kwargs:
+                Order.objects.create(user_id=1, gift_id=1, donation=20000, status_id=11)
+            return original_filter(*args, **kwargs)
+
+        with patch.object(Project.objects, 'filter', side_effect=filter_with_pledge):
+            call_command('rebuild_project_aggregates', stdout=StringIO())
+
+        self.assertFunding('30000.00', 2, '30.00')
+
+def create_pledge_fixtures(stock):
+    User.objects.create(id=1, fullname='사용자1', email='email1')
+    Category.objects.create(id=1, name='카테고리1')
+    Project.objects.create(
+        id            = 1,
+        user_id       = 1,
+        category_id   = 1,
+        name          = '프로젝트1',
+        opening_date  = datetime.datetime.now() - datetime.timedelta(days=1),
+        closing_date  = datetime.datetime.now() + datetime.timedelta(days=30),
+        thumbnail_url = '사진1',
+        goal_amount   = 100000.00,
+        summary       = '프로젝트요약1',
+        project_uri   = 'uri'
+        )
+    Gift.objects.create(id=1, project_id=1, name='옵션1', price=10000.00, quantity_sold=0, stock=stock)
+
+def pledge(client, body, **headers):
+    access_token = jwt.encode({'id': 1}, SECRET_KEY, algorithm=ALGORITHM)
+    return client.post('/order/pledge', json.dumps(body), content_type='application/json', HTTP_Authorization=access_token, **headers)
+
+class PledgeViewTest(TestCase):
+
+    def setUp(self):
+        create_pledge_fixtures(stock=1)
+
+    def test_pledge_reserves_stock_and_records_order(self):
+        response = pledge(self.client, {'gift_id': 1, 'donation': 5000})
+        order    = Order.objects.get()
+        gift     = Gift.objects.get(id=1)
+        project  = Project.objects.get(id=1)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json(), {'message': 'SUCCESS', 'order_id': order.id})
+        self.assertEqual((order.donation, order.status.status), (Decimal('15000.00'), 'pledged'))
+        self.assertEqual((gift.stock, gift.quantity_sold), (0, 1))
+        self.assertEqual((project.total_amount, project.total_supporters), (Decimal('15000.00'), 1))
+
+    def test_pledge_sold_out(self):
+        pledge(self.client, {'gift_id': 1})
+        response = pledge(self.client, {'gift_id': 1})
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json(), {'message': 'SOLD_OUT'})
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertEqual(Gift.objects.get(id=1).stock, 0)
+
+    def test_pledge_errors(self):
+        self.assertEqual(pledge(self.client, {'donation': 0}).json(), {'message': 'KEY_ERROR'})
+        self.assertEqual(pledge(self.client, {'gift_id': 99}).status_code, 404)
+        self.assertEqual(pledge(self.client, {'gift_id': 1, 'donation': -1}).json(), {'message': 'INVALID_AMOUNT'})
+        self.assertEqual(pledge(self.client, {'gift_id': 1, 'donation': 'NaN'}).json(), {'message': 'INVALID_AMOUNT'})
+
+        Project.objects.filter(id=1).update(closing_date=datetime.datetime.now() - datetime.timedelta(days=1))
+        self.assertEqual(pledge(self.client, {'gift_id': 1}).json(), {'message': 'PROJECT_CLOSED'})
+
+        self.assertFalse(Order.objects.exists())
+        self.assertEqual(Gift.objects.get(id=1).stock, 1)
+
+    def test_placed_status_is_seeded_by_migration(self):
+        self.assertEqual(Status.objects.filter(status='pledged').count(), 1)
+
+    def test_pledge_without_placed_status_is_an_error(self):
+        Status.objects.filter(status='pledged').delete()
+
+        with self.assertRaises(ImproperlyConfigured):
+            place_order(1, 1, 0)
+
+        self.assertFalse(Status.objects.filter(status='pledged').exists())
+        self.assertEqual(Gift.objects.get(id=1).stock, 1)
+
+    def test_pledge_with_deleted_user(self):
+        User.objects.create(id=2, fullname='사용자2', email='email2')
+        access_token = jwt.encode({'id': 2}, SECRET_KEY, algorithm=ALGORITHM)
+        User.objects.filter(id=2).delete()
+
+        for headers in [{}, {'HTTP_IDEMPOTENCY_KEY': 'deleted'}]:
+            response = self.client.post(
+                '/order/pledge', json.dumps({'gift_id': 1}), content_type='application/json', HTTP_Authorization=access_token, **headers
+            )
+            self.assertEqual((response.status_code, response.json()), (401, {'message': 'INVALID_USER'}))
+
+        self.assertFalse(Order.objects.exists())
+        self.assertFalse(IdempotencyKey.objects.exists())
+        self.assertEqual(Gift.objects.get(id=1).stock, 1)
+
+    def test_pledge_need_login(self):
+        response = self.client.post('/order/pledge', json.dumps({'gift_id': 1}), content_type='application/json')
+
+        self.assertEqual(response.status_code, 401)
+
+class PledgeIdempotencyTest(TestCase):
+
+    def setUp(self):
+        create_pledge_fixtures(stock=5)
+
+    def test_retry_replays_stored_response(self):
+        first = pledge(self.client, {'gift_id': 1}, HTTP_IDEMPOTENCY_KEY='retry-1')
+
+        # 캐시가 비워져도 키는 DB 에 남아 있어서 재시도를 다시 실행하지 않는다
+        cache.clear()
+        with self.assertNumQueries(1):
+            retry = pledge(self.client, {'gift_id': 1}, HTTP_IDEMPOTENCY_KEY='retry-1')
+
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual((retry.status_code, retry.json()), (201, first.json()))
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertEqual(Gift.objects.get(id=1).stock, 4)
+
+        pledge(self.client, {'gift_id': 1}, HTTP_IDEMPOTENCY_KEY='retry-2')
+        self.assertEqual(Order.objects.count(), 2)
+
+    def test_key_reused_with_different_body(self):
+        pledge(self.client, {'gift_id': 1}, HTTP_IDEMPOTENCY_KEY='reused')
+        response = pledge(self.client, {'gift_id': 1, 'donation': 1000}, HTTP_IDEMPOTENCY_KEY='reused')
+
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(response.json(), {'message': 'IDEMPOTENCY_KEY_REUSED'})
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_concurrent_retry_is_rejected_while_in_progress(self):
+        retries = []
+
+        def place_order_during_retry(*args):
+            retries.append(pledge(Client(), {'gift_id': 1}, HTTP_IDEMPOTENCY_KEY='same'))
+            return place_order(*args)
+
+        with patch('order.views.place_order', side_effect=place_order_during_retry):
+            response = pledge(self.client, {'gift_id': 1}, HTTP_IDEMPOTENCY_KEY='same')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((retries[0].status_code, retries[0]['Retry-After']), (409, '1'))
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_server_error_is_not_stored(self):
+        with patch('order.views.place_order', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                pledge(self.client, {'gift_id': 1}, HTTP_IDEMPOTENCY_KEY='error')
+
+        self.assertEqual(pledge(self.client, {'gift_id': 1}, HTTP_IDEMPOTENCY_KEY='error').status_code, 201)
+
+    def test_abandoned_request_is_taken_over_after_lock_timeout(self):
+        # 처리하던 워커가 죽어서 처리 중 표시만 남은 경우
+        with patch('order.views.place_order', side_effect=SystemExit):
+            with self.assertRaises(SystemExit):
+                pledge(self.client, {'gift_id': 1}, HTTP_IDEMPOTENCY_KEY='crash')
+
+        self.assertEqual(pledge(self.client, {'gift_id': 1}, HTTP_IDEMPOTENCY_KEY='crash').status_code, 409)
+
+        IdempotencyKey.objects.update(created_at=timezone.now() - datetime.timedelta(seconds=31))
+        self.assertEqual(pledge(self.client, {'gift_id': 1}, HTTP_IDEMPOTENCY_KEY='crash').status_code, 201)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_purge_expired_keys(self):
+        pledge(self.client, {'gift_id': 1}, HTTP_IDEMPOTENCY_KEY='old')
+        IdempotencyKey.objects.update(created_at=timezone.now() - datetime.timedelta(days=2))
+        pledge(self.client, {'gift_id': 1}, HTTP_IDEMPOTENCY_KEY='new')
+
+        call_command('purge_idempotency_keys', stdout=StringIO())
+
+        self.assertEqual(IdempotencyKey.objects.count(), 1)
+
+class PledgeConcurrencyTest(TransactionTestCase):
+    # 앞선 TransactionTestCase 의 flush 가 마이그레이션으로 만든 주문 상태까지 지우므로 되살린다
+    serialized_rollback = True
+
+    PLEDGES = 200
+    STOCK   = 10
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.file_db = None
+
+        # 공유 캐시 메모리 SQLite 는 다른 스레드의 잠금을 기다리지 않고 바로 실패하므로 파일 DB 로 바꿔서 돌린다
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            cls.file_db           = tempfile.TemporaryDirectory()
+            cls.memory_name       = connection.settings_dict['NAME']
+            cls.memory_connection = connection.connection
+
+            connection.connection            = None
+            connection.settings_dict['NAME'] = os.path.join(cls.file_db.name, 'pledge.sqlite3')
+            call_command('migrate', verbosity=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        if cls.file_db:
+            connection.close()
+            connection.settings_dict['NAME'] = cls.memory_name
+            connection.connection            = cls.memory_connection
+            cls.file_db.cleanup()
+
+        super().tearDownClass()
+
+    def test_concurrent_pledges_never_oversell(self):
+        create_pledge_fixtures(stock=self.STOCK)
+
+        barrier  = threading.Barrier(self.PLEDGES)
+        statuses = []
+
+        def worker():
+            try:
+                client = Client()
+                barrier.wait()
+                statuses.append(pledge(client, {'gift_id': 1}).status_code)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(self.PLEDGES)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        gift    = Gift.objects.get(id=1)
+        project = Project.objects.get(id=1)
+
+        self.assertEqual(sorted(statuses), [201] * self.STOCK + [409] * (self.PLEDGES - self.STOCK))
+        self.assertEqual((gift.stock, gift.quantity_sold), (0, self.STOCK))
+        self.assertEqual(Order.objects.count(), self.STOCK)
+        self.assertEqual(project.total_supporters, self.STOCK)
+        self.assertEqual(project.total_amount, Decimal('10000.00') * self.STOCK)
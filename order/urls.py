@@ -0,0 +1,7 @@
+from django.urls import path
+
+from .views      import PledgeView
+
+urlpatterns = [
+    path('/pledge', PledgeView.as_view()),
+]
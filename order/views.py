@@ -1,3 +1,28 @@
-from django.shortcuts import render
+import json
 
-# Create your views here.
+from django.http         import JsonResponse
+from django.views        import View
+
+from tumbluv.idempotency import idempotent
+from user.utils          import login_decorator
+from .placement          import PledgeError, place_order
+
+PLEDGE_ERROR_STATUS = {
+    'GIFT_NOT_EXIST': 404,
+    'SOLD_OUT'      : 409,
+}
+
+class PledgeView(View):
+    @login_decorator
+    @idempotent
+    def post(self, request):
+        data = json.loads(request.body)
+        try:
+            order = place_order(request.user.id, data['gift_id'], data.get('donation', 0))
+
+            return JsonResponse({'message': 'SUCCESS', 'order_id': order.id}, status=201)
+
+        except KeyError:
+            return JsonResponse({'message': 'KEY_ERROR'}, status=400)
+        except PledgeError as error:
+            return JsonResponse({'message': error.message}, status=PLEDGE_ERROR_STATUS.get(error.message, 400))
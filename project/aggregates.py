@@ -0,0 +1,36 @@
+from decimal                     import Decimal
+
+from django.db                   import transaction
+from django.db.models            import F, Case, When, Value, DecimalField, IntegerField
+from django.db.models.functions  import Coalesce
+
+from .cache                      import invalidate_project_list, invalidate_project_detail
+from .models                     import Project
+
+def calculate_achieved_rate(total_amount, goal_amount):
+    if not goal_amount:
+        return None
+    return (Decimal(total_amount) * 100 / goal_amount).quantize(Decimal('0.01'))
+
+def get_achieved_rate_expression():
+    # calculate_achieved_rate 와 같이 목표 금액이 0 이면 달성률을 비워 둔다
+    return Case(
+        When(goal_amount=0, then=Value(None)),
+        default=F('total_amount') * 100 / F('goal_amount'),
+        output_field=DecimalField()
+    )
+
+def apply_funding(project_id, amount, supporters):
+    # 동시에 들어오는 후원이 서로 덮어쓰지 않도록 F 표현식으로만 갱신한다
+    with transaction.atomic():
+        Project.objects.filter(id=project_id).update(
+            total_amount     = Coalesce(F('total_amount'), Value(0, output_field=DecimalField())) + Value(amount, output_field=DecimalField()),
+            total_supporters = Coalesce(F('total_supporters'), Value(0, output_field=IntegerField())) + supporters,
+        )
+        Project.objects.filter(id=project_id).update(
+            achieved_rate = get_achieved_rate_expression()
+        )
+        transaction.on_commit(invalidate_project_list)
+        transaction.on_commit(lambda: invalidate_project_detail(
+            Project.objects.filter(id=project_id).values_list('project_uri', flat=True)
+        ))
@@ -0,0 +1,80 @@
+import hashlib
+
+from urllib.parse      import urlencode
+
+from django.conf       import settings
+from django.core.cache import caches
+from django.http       import HttpResponse
+
+from tumbluv.routers   import use_primary
+
+LIST_VERSION_KEY = 'project:list:version'
+LIST_PARAMS      = {
+    'category' : '',
+    'status'   : '0',
+    'achieve'  : '',
+    'money'    : '0',
+    'sort'     : '',
+    'offset'   : '0',
+    'limit'    : '12',
+}
+
+def get_cache():
+    return caches[settings.PROJECT_CACHE['ALIAS']]
+
+def get_list_version():
+    cache   = get_cache()
+    version = cache.get(LIST_VERSION_KEY)
+
+    if version is None:
+        cache.add(LIST_VERSION_KEY, 1, None)
+        version = cache.get(LIST_VERSION_KEY, 1)
+
+    return version
+
+def invalidate_project_list():
+    # 버전을 올리면 이전 버전의 키는 더 이상 조회되지 않고 TIMEOUT 후 사라진다
+    cache = get_cache()
+
+    try:
+        cache.incr(LIST_VERSION_KEY)
+    except ValueError:
+        cache.add(LIST_VERSION_KEY, 1, None)
+
+def get_list_cache_key(params):
+    normalized = [(key, params.get(key) or default) for key, default in sorted(LIST_PARAMS.items())]
+
+    if 'cursor' in params:
+        normalized.append(('cursor', params['cursor']))
+
+    digest = hashlib.md5(urlencode(normalized).encode('utf-8')).hexdigest()
+    return f'project:list:{get_list_version()}:{digest}'
+
+def get_detail_cache_key(project_uri):
+    digest = hashlib.md5(project_uri.encode('utf-8')).hexdigest()
+    return f'project:detail:{digest}'
+
+def invalidate_project_detail(project_uris):
+    get_cache().delete_many([get_detail_cache_key(uri) for uri in project_uris if uri is not None])
+
+def cache_project_list(func):
+    def wrapper(self, request, *args, **kwargs):
+        if 'Authorization' in request.headers:
+            return func(self, request, *args, **kwargs)
+
+        cache   = get_cache()
+        key     = get_list_cache_key(request.GET)
+        content = cache.get(key)
+
+        if content is not None:
+            return HttpResponse(content, content_type='application/json', status=200)
+
+        # 쓰기가 커밋되어 버전이 오른 직후 지연된 replica 의 이전 목록을 새 버전으로 캐시하지 않도록 primary 에서 채운다
+        with use_primary():
+            response = func(self, request, *args, **kwargs)
+
+        if response.status_code == 200:
+            cache.set(key, response.content, settings.PROJECT_CACHE['LIST_TIMEOUT'])
+
+        return response
+    return wrapper
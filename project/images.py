@@ -0,0 +1,37 @@
+import io
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+IMAGE_FORMATS = {
+    'webp' : ('WEBP', 'image/webp'),
+    'jpeg' : ('JPEG', 'image/jpeg'),
+}
+
+def make_variants(data, widths, quality):
+    # 프로세스 풀에서 실행된다. EXIF 등 메타데이터는 다시 인코딩하면서 버려진다
+    source = ImageOps.exif_transpose(Image.open(io.BytesIO(data)))
+
+    if source.mode in ('RGBA', 'LA', 'P'):
+        source     = source.convert('RGBA')
+        background = Image.new('RGB', source.size, (255, 255, 255))
+        background.paste(source, mask=source.split()[-1])
+        source     = background
+    elif source.mode != 'RGB':
+        source = source.convert('RGB')
+
+    variants = {}
+
+    for name, width in widths.items():
+        image = source
+        if image.width > width:
+            image = image.resize((width, max(1, round(image.height * width / image.width))), Image.LANCZOS)
+
+        for extension, (image_format, content_type) in IMAGE_FORMATS.items():
+            output = io.BytesIO()
+            image.save(output, image_format, quality=quality)
+            variants[(name, extension)] = output.getvalue()
+
+    return variants
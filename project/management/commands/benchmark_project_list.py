@@ -0,0 +1,52 @@
+import time
+
+from wsgiref.util                import setup_testing_defaults
+
+from django.conf                 import settings
+from django.core.handlers.wsgi   import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.db                   import connections
+from django.test.utils           import override_settings
+
+class Command(BaseCommand):
+    help = 'Measure requests per second on the project list with and without persistent DB connections'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--path', default='/project')
+        parser.add_argument('--database', default='default')
+        parser.add_argument('--conn-max-age', type=int, default=60)
+
+    def get_environ(self, path):
+        path_info, _, query_string = path.partition('?')
+        environ = {'REQUEST_METHOD': 'GET', 'PATH_INFO': path_info, 'QUERY_STRING': query_string}
+        setup_testing_defaults(environ)
+        return environ
+
+    def measure(self, handler, path, count):
+        start = time.perf_counter()
+
+        # 테스트 클라이언트와 달리 WSGIHandler 는 요청이 끝날 때 CONN_MAX_AGE 에 따라 연결을 닫는다
+        for _ in range(count):
+            response = handler(self.get_environ(path), lambda status, headers: None)
+            b''.join(response)
+            response.close()
+
+        return count / (time.perf_counter() - start)
+
+    def handle(self, *args, **options):
+        handler    = WSGIHandler()
+        connection = connections[options['database']]
+
+        # 목록 캐시가 응답하면 DB 에 닿지 않으므로 측정하는 동안 끈다
+        with override_settings(PROJECT_CACHE={**settings.PROJECT_CACHE, 'LIST_TIMEOUT': 0}):
+            self.measure(handler, options['path'], 10)
+
+            for label, conn_max_age in (('without reuse', 0), ('with reuse', options['conn_max_age'])):
+                connection.close()
+                connection.settings_dict['CONN_MAX_AGE'] = conn_max_age
+
+                rps = self.measure(handler, options['path'], options['requests'])
+                self.stdout.write(f'{label:<14} CONN_MAX_AGE={conn_max_age:<4} {rps:8.1f} req/s')
+
+        connection.close()
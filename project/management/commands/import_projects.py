@@ -0,0 +1,86 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db                   import transaction, IntegrityError
+
+from project.registration        import RegistrationError, parse_project, register_project
+from user.models                 import User
+
+class Command(BaseCommand):
+    help = 'Import projects from a JSONL file (one RegisterView payload plus user_id per line)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--batch-size', type=int, default=200)
+
+    def handle(self, *args, **options):
+        imported = 0
+        failed   = 0
+
+        try:
+            with open(options['path'], encoding='utf-8') as lines:
+                batch = []
+
+                for number, line in enumerate(lines, 1):
+                    if line.strip():
+                        batch.append((number, line))
+
+                    if len(batch) >= options['batch_size']:
+                        succeeded = self.import_batch(batch)
+                        imported += succeeded
+                        failed   += len(batch) - succeeded
+                        batch     = []
+
+                succeeded = self.import_batch(batch)
+                imported += succeeded
+                failed   += len(batch) - succeeded
+
+        except OSError as error:
+            raise CommandError(error)
+
+        self.stdout.write(f'{imported} projects imported, {failed} failed')
+
+    def parse_batch(self, batch):
+        rows = []
+
+        for number, line in batch:
+            try:
+                data = json.loads(line)
+            except json.JSONDecodeError:
+                data = None
+
+            if isinstance(data, dict):
+                rows.append((number, data))
+            else:
+                self.stderr.write(f'line {number}: INVALID_JSON')
+
+        return rows
+
+    def import_batch(self, batch):
+        succeeded = 0
+        rows      = self.parse_batch(batch)
+
+        # 없는 user_id 는 MySQL 에선 IntegrityError 로, SQLite 에선 커밋 때 배치 전체 실패로 나타나므로 미리 한 번에 확인한다
+        user_ids = set(User.objects.filter(
+            id__in={data['user_id'] for number, data in rows if isinstance(data.get('user_id'), int)}
+        ).values_list('id', flat=True))
+
+        # 배치마다 한 트랜잭션, 프로젝트마다 savepoint 를 둔다
+        with transaction.atomic():
+            for number, data in rows:
+                try:
+                    if data['user_id'] not in user_ids:
+                        self.stderr.write(f'line {number}: INVALID_USER')
+                        continue
+
+                    register_project(data['user_id'], parse_project(data))
+                    succeeded += 1
+
+                except KeyError as error:
+                    self.stderr.write(f'line {number}: KEY_ERROR {error}')
+                except RegistrationError as error:
+                    self.stderr.write(f'line {number}: {error.message}')
+                except IntegrityError:
+                    self.stderr.write(f'line {number}: DUPLICATED_ENTRY')
+
+        return succeeded
@@ -0,0 +1,48 @@
+from django.conf                 import settings
+from django.core.management.base import BaseCommand
+from django.db                   import transaction
+from django.db.models            import Sum, Count, OuterRef, Subquery, Value, DecimalField, IntegerField
+from django.db.models.functions  import Coalesce
+
+from order.models                import Order
+from project.aggregates          import get_achieved_rate_expression
+from project.models              import Project
+from tumbluv.lookups             import statuses
+
+class Command(BaseCommand):
+    help = 'Rebuild total_amount, total_supporters and achieved_rate of every project from orders'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        orders     = Order.objects.filter(gift__project_id=OuterRef('pk')).exclude(
+            status_id__in=statuses.get_ids(settings.ORDER_CANCELED_STATUSES)
+        ).order_by().values('gift__project_id')
+
+        amount     = orders.annotate(amount=Sum('donation')).values('amount')
+        supporters = orders.annotate(supporters=Count('id')).values('supporters')
+
+        projects = Project.objects.order_by('id').values_list('id', flat=True)
+        last_id  = 0
+        updated  = 0
+
+        while True:
+            ids = list(projects.filter(id__gt=last_id)[:batch_size])
+            if not ids:
+                break
+
+            # 집계를 UPDATE 안의 서브쿼리로 계산해 읽기와 쓰기 사이에 들어온 후원이 덮어써지지 않게 한다
+            with transaction.atomic():
+                batch = Project.objects.filter(id__in=ids)
+                batch.update(
+                    total_amount     = Coalesce(Subquery(amount), Value(0, output_field=DecimalField())),
+                    total_supporters = Coalesce(Subquery(supporters), Value(0, output_field=IntegerField())),
+                )
+                batch.update(achieved_rate=get_achieved_rate_expression())
+
+            last_id  = ids[-1]
+            updated += len(ids)
+
+        self.stdout.write(f'{updated} projects rebuilt')
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from project.models              import Project
+from project.search              import index_project
+
+class Command(BaseCommand):
+    help = 'Rebuild the project search documents and inverted index from projects and stories'
+
+    def handle(self, *args, **options):
+        project_ids = list(Project.objects.order_by('id').values_list('id', flat=True))
+
+        for project_id in project_ids:
+            index_project(project_id)
+
+        self.stdout.write(f'{len(project_ids)} projects indexed')
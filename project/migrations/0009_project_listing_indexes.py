@@ -0,0 +1,53 @@
+# Generated by Django 3.1.6 on 2026-10-18 16:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0008_merge_20210312_1000'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['achieved_rate', 'id'], name='projects_achieved_rate_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['opening_date', 'id'], name='projects_opening_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['closing_date', 'id'], name='projects_closing_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['total_supporters', 'id'], name='projects_supporters_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['total_amount', 'id'], name='projects_total_amount_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['category', 'achieved_rate', 'id'], name='projects_cat_achieved_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['category', 'opening_date', 'id'], name='projects_cat_opening_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['category', 'closing_date', 'id'], name='projects_cat_closing_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['category', 'total_supporters', 'id'], name='projects_cat_supporters_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['category', 'total_amount', 'id'], name='projects_cat_amount_idx'),
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 3.1.6 on 2026-10-18 17:09
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+FULLTEXT_INDEXES = {
+    'project_search_documents_ft'       : 'title, body',
+    'project_search_documents_title_ft' : 'title',
+}
+
+
+def create_fulltext_indexes(apps, schema_editor):
+    # 한국어는 띄어쓰기 단위로 쪼개면 조사가 붙어 검색이 안 되므로 ngram 파서를 쓴다
+    if schema_editor.connection.vendor != 'mysql':
+        return
+
+    for name, columns in FULLTEXT_INDEXES.items():
+        schema_editor.execute(f'CREATE FULLTEXT INDEX {name} ON project_search_documents ({columns}) WITH PARSER ngram')
+
+
+def drop_fulltext_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'mysql':
+        return
+
+    for name in FULLTEXT_INDEXES:
+        schema_editor.execute(f'DROP INDEX {name} ON project_search_documents')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0010_stored_file'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('project', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, serialize=False, to='project.project')),
+                ('title', models.TextField()),
+                ('body', models.TextField()),
+            ],
+            options={
+                'db_table': 'project_search_documents',
+            },
+        ),
+        migrations.CreateModel(
+            name='SearchTerm',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=20)),
+                ('frequency', models.IntegerField()),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='project.project')),
+            ],
+            options={
+                'db_table': 'project_search_terms',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='searchterm',
+            constraint=models.UniqueConstraint(fields=('term', 'project'), name='project_search_terms_term_uniq'),
+        ),
+        migrations.RunPython(create_fulltext_indexes, drop_fulltext_indexes),
+    ]
@@ -26,6 +26,18 @@ class Project(models.Model):
 
     class Meta:
         db_table = 'projects'
+        indexes  = [
+            models.Index(fields=['achieved_rate', 'id'], name='projects_achieved_rate_idx'),
+            models.Index(fields=['opening_date', 'id'], name='projects_opening_date_idx'),
+            models.Index(fields=['closing_date', 'id'], name='projects_closing_date_idx'),
+            models.Index(fields=['total_supporters', 'id'], name='projects_supporters_idx'),
+            models.Index(fields=['total_amount', 'id'], name='projects_total_amount_idx'),
+            models.Index(fields=['category', 'achieved_rate', 'id'], name='projects_cat_achieved_idx'),
+            models.Index(fields=['category', 'opening_date', 'id'], name='projects_cat_opening_idx'),
+            models.Index(fields=['category', 'closing_date', 'id'], name='projects_cat_closing_idx'),
+            models.Index(fields=['category', 'total_supporters', 'id'], name='projects_cat_supporters_idx'),
+            models.Index(fields=['category', 'total_amount', 'id'], name='projects_cat_amount_idx'),
+        ]
 
 class Gift(models.Model):
     project       = models.ForeignKey('Project', on_delete=models.CASCADE)
@@ -61,3 +73,31 @@ class Like(models.Model):
 
     class Meta:
         db_table = 'likes'
+
+class StoredFile(models.Model):
+    content_hash = models.CharField(max_length=64, unique=True)
+    key          = models.CharField(max_length=200)
+    has_variants = models.BooleanField(default=False)
+    created_at   = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'stored_files'
+
+class SearchDocument(models.Model):
+    project = models.OneToOneField('Project', on_delete=models.CASCADE, primary_key=True)
+    title   = models.TextField()
+    body    = models.TextField()
+
+    class Meta:
+        db_table = 'project_search_documents'
+
+class SearchTerm(models.Model):
+    project   = models.ForeignKey('Project', on_delete=models.CASCADE)
+    term      = models.CharField(max_length=20)
+    frequency = models.IntegerField()
+
+    class Meta:
+        db_table    = 'project_search_terms'
+        constraints = [
+            models.UniqueConstraint(fields=['term', 'project'], name='project_search_terms_term_uniq'),
+        ]
@@ -0,0 +1,97 @@
+from datetime        import datetime
+from decimal         import Decimal, InvalidOperation
+
+from django.db       import transaction
+
+from tumbluv.lookups import categories
+from .aggregates     import calculate_achieved_rate
+from .models         import Project, Story, Gift
+
+class RegistrationError(Exception):
+    def __init__(self, message):
+        super().__init__(message)
+        self.message = message
+
+def parse_category(name):
+    category_id = categories.get_id(name)
+
+    if category_id is None:
+        raise RegistrationError('INVALID_CATEGORY')
+
+    return category_id
+
+def parse_date(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d')
+    except (TypeError, ValueError):
+        raise RegistrationError('INVALID_DATE')
+
+def parse_amount(value, message):
+    try:
+        amount = Decimal(str(value))
+    except InvalidOperation:
+        raise RegistrationError(message)
+
+    if not amount.is_finite() or amount < 0:
+        raise RegistrationError(message)
+
+    return amount
+
+def parse_count(value, message):
+    if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+        raise RegistrationError(message)
+
+    return value
+
+def parse_project(data):
+    project = {
+        'name'          : data['name'],
+        'thumbnail_url' : data['thumbnail_url'],
+        'summary'       : data['summary'],
+        'category_id'   : parse_category(data['category']),
+        'story'         : data['story'],
+        'goal_amount'   : parse_amount(data['goal_amount'], 'INVALID_AMOUNT'),
+        'opening_date'  : parse_date(data['opening_date']),
+        'closing_date'  : parse_date(data['closing_date']),
+        'project_uri'   : data['project_uri'],
+        'gifts'         : [{
+            'name'          : gift['gift_name'],
+            'price'         : parse_amount(gift['gift_price'], 'INVALID_GIFT'),
+            'stock'         : parse_count(gift['gift_stock'], 'INVALID_GIFT'),
+            } for gift in data['gifts']],
+        }
+
+    if project['opening_date'] > project['closing_date']:
+        raise RegistrationError('INVALID_DATE')
+
+    return project
+
+def register_project(user_id, project):
+    # Project, Story, Gift 를 gift 개수와 상관없이 세 번의 INSERT 로 저장한다.
+    # 모금액, 후원자 수, 판매 수량은 클라이언트 값을 받지 않고 0 에서 시작해 주문 시그널과 rebuild_project_aggregates 만 바꾼다
+    with transaction.atomic():
+        created = Project.objects.create(
+            category_id      = project['category_id'],
+            user_id          = user_id,
+            name             = project['name'],
+            opening_date     = project['opening_date'],
+            closing_date     = project['closing_date'],
+            thumbnail_url    = project['thumbnail_url'],
+            goal_amount      = project['goal_amount'],
+            total_amount     = 0,
+            total_supporters = 0,
+            achieved_rate    = calculate_achieved_rate(0, project['goal_amount']),
+            summary          = project['summary'],
+            project_uri      = project['project_uri']
+        )
+
+        Story.objects.create(
+            content    = project['story'],
+            project_id = created.id
+        )
+
+        Gift.objects.bulk_create([
+            Gift(project_id=created.id, quantity_sold=0, **gift) for gift in project['gifts']
+        ])
+
+    return created
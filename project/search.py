@@ -0,0 +1,183 @@
+import re
+import html
+
+from collections         import Counter
+from functools           import partial
+
+from django.conf         import settings
+from django.db           import connections, router, transaction
+from django.dispatch     import receiver
+from django.test.signals import setting_changed
+from django.utils.html   import strip_tags
+
+from tumbluv.routers     import use_primary
+from .models             import Project, Story, SearchDocument, SearchTerm
+
+WORD_PATTERN = re.compile(r'\w+')
+
+def get_words(text):
+    # ngram 보다 짧은 단어는 MySQL 도 색인하지 않으므로 똑같이 버린다
+    size = settings.PROJECT_SEARCH['NGRAM_SIZE']
+    return [word for word in WORD_PATTERN.findall(text.lower()) if len(word) >= size]
+
+def get_ngrams(word):
+    size = settings.PROJECT_SEARCH['NGRAM_SIZE']
+    return [word[i:i + size] for i in range(len(word) - size + 1)]
+
+def tokenize(text):
+    return [ngram for word in get_words(text) for ngram in get_ngrams(word)]
+
+def get_term_frequencies(title, body):
+    frequencies = Counter(tokenize(body))
+
+    for term, count in Counter(tokenize(title)).items():
+        frequencies[term] += count * settings.PROJECT_SEARCH['TITLE_WEIGHT']
+
+    return frequencies
+
+class FulltextBackend:
+    # 검색어마다 +를 붙여 모든 단어가 들어간 문서만 찾는다 (ngram 파서는 단어를 ngram 구문 검색으로 바꾼다)
+    SEARCH_SQL = (
+        'SELECT project_id FROM project_search_documents '
+        'WHERE MATCH(title, body) AGAINST(%s IN BOOLEAN MODE) '
+        'ORDER BY MATCH(title, body) AGAINST(%s IN BOOLEAN MODE) + MATCH(title) AGAINST(%s IN BOOLEAN MODE) * %s DESC, '
+        'project_id LIMIT %s OFFSET %s'
+    )
+    COUNT_SQL = 'SELECT COUNT(*) FROM project_search_documents WHERE MATCH(title, body) AGAINST(%s IN BOOLEAN MODE)'
+
+    def index(self, project_id, title, body):
+        # InnoDB 가 SearchDocument 를 저장할 때 FULLTEXT 인덱스를 함께 고친다
+        pass
+
+    def search(self, words, offset, limit):
+        query  = ' '.join(f'+{word}' for word in words)
+        weight = settings.PROJECT_SEARCH['TITLE_WEIGHT'] - 1
+
+        with connections[router.db_for_read(SearchDocument)].cursor() as cursor:
+            cursor.execute(self.COUNT_SQL, [query])
+            count = cursor.fetchone()[0]
+
+            cursor.execute(self.SEARCH_SQL, [query, query, query, weight, limit, offset])
+            project_ids = [row[0] for row in cursor.fetchall()]
+
+        return count, project_ids
+
+class InvertedIndexBackend:
+    # FULLTEXT 가 없는 DB 에서는 ngram 별 출현 횟수를 project_search_terms 에 두고 SQL 로 점수를 매긴다.
+    # 점수는 sum(frequency * idf^2), idf = ln(1 + 문서 수 / 그 ngram 이 나온 문서 수) 이다.
+    # 모든 ngram 이 있는 프로젝트만 남기고 (HAVING) 정렬, 자르기, 전체 개수(COUNT OVER) 까지 쿼리 한 번으로 끝낸다.
+    # offset 이 결과보다 뒤면 돌아오는 행이 없으므로 개수도 0 이 된다.
+    SEARCH_SQL = (
+        'SELECT t.project_id, COUNT(*) OVER () FROM project_search_terms t '
+        'JOIN ('
+        'SELECT term, POWER(LN(1 + (SELECT COUNT(*) FROM project_search_documents) * 1.0 / COUNT(*)), 2) AS weight '
+        'FROM project_search_terms WHERE term IN ({terms}) GROUP BY term'
+        ') w ON w.term = t.term '
+        'JOIN project_search_documents d ON d.project_id = t.project_id '
+        'WHERE t.term IN ({terms}) AND {words} '
+        'GROUP BY t.project_id HAVING COUNT(*) = %s '
+        'ORDER BY SUM(t.frequency * w.weight) DESC, t.project_id LIMIT %s OFFSET %s'
+    )
+    # ngram 이 모두 있어도 떨어져 있을 수 있으므로 원문에 단어가 그대로 있는지도 확인한다
+    WORD_SQL = "(LOWER(d.title) LIKE %s ESCAPE '\\' OR LOWER(d.body) LIKE %s ESCAPE '\\')"
+
+    def index(self, project_id, title, body):
+        frequencies = get_term_frequencies(title, body)
+        existing    = {
+            term: (id, frequency)
+            for id, term, frequency in SearchTerm.objects.filter(project_id=project_id).values_list('id', 'term', 'frequency')
+        }
+
+        # 바뀐 ngram 만 지우고, 고치고, 더한다
+        SearchTerm.objects.filter(id__in=[id for term, (id, _) in existing.items() if term not in frequencies]).delete()
+        SearchTerm.objects.bulk_update([
+            SearchTerm(id=existing[term][0], frequency=frequency)
+            for term, frequency in frequencies.items()
+            if term in existing and existing[term][1] != frequency
+        ], ['frequency'])
+        SearchTerm.objects.bulk_create([
+            SearchTerm(project_id=project_id, term=term, frequency=frequency)
+            for term, frequency in frequencies.items() if term not in existing
+        ])
+
+    def get_pattern(self, word):
+        # \w 로 자른 단어에서 LIKE 특수문자는 _ 뿐이다
+        return '%' + word.replace('_', '\\_') + '%'
+
+    def search(self, words, offset, limit):
+        terms = sorted({ngram for word in words for ngram in get_ngrams(word)})
+        sql   = self.SEARCH_SQL.format(
+            terms = ', '.join(['%s'] * len(terms)),
+            words = ' AND '.join([self.WORD_SQL] * len(words))
+        )
+        patterns = [self.get_pattern(word) for word in words for _ in range(2)]
+
+        with connections[router.db_for_read(SearchTerm)].cursor() as cursor:
+            cursor.execute(sql, [*terms, *terms, *patterns, len(terms), limit, offset])
+            rows = cursor.fetchall()
+
+        return (rows[0][1] if rows else 0), [project_id for project_id, _ in rows]
+
+SEARCH_BACKENDS = {
+    'fulltext' : FulltextBackend,
+    'index'    : InvertedIndexBackend,
+}
+
+backend = None
+
+def get_backend():
+    global backend
+
+    if backend is None:
+        backend = SEARCH_BACKENDS[settings.PROJECT_SEARCH['BACKEND']]()
+
+    return backend
+
+def reset_backend():
+    global backend
+    backend = None
+
+@receiver(setting_changed)
+def project_search_changed(setting, **kwargs):
+    if setting == 'PROJECT_SEARCH':
+        reset_backend()
+
+def get_story_text(content):
+    # 스토리는 에디터가 만든 HTML 이므로 태그 이름이나 속성값이 검색되지 않게 글자만 색인한다.
+    # </p><p> 처럼 붙은 태그를 지우면 앞뒤 단어가 이어지므로 태그 앞에 공백을 넣고 지운다.
+    return html.unescape(strip_tags(content.replace('<', ' <'))).strip()
+
+def index_project(project_id):
+    with use_primary(), transaction.atomic():
+        project = Project.objects.filter(id=project_id).values_list('name', 'summary').first()
+
+        # 지워진 프로젝트의 문서와 ngram 은 CASCADE 로 함께 지워진다
+        if project is None:
+            return
+
+        stories = Story.objects.filter(project_id=project_id).order_by('id').values_list('content', flat=True)
+        title   = '\n'.join(project)
+        body    = '\n'.join(get_story_text(content) for content in stories)
+
+        SearchDocument.objects.update_or_create(project_id=project_id, defaults={'title': title, 'body': body})
+        get_backend().index(project_id, title, body)
+
+def is_index_scheduled(callback, project_id):
+    return isinstance(callback, partial) and callback.func is index_project and callback.args == (project_id,)
+
+def schedule_index_project(project_id):
+    # 프로젝트 삭제의 CASCADE 도중에도 Story 시그널이 오므로 커밋된 뒤의 상태로 색인한다.
+    # 한 트랜잭션에서 스토리를 여러 개 저장해도 프로젝트마다 한 번만 색인하도록 이미 걸린 콜백이 있으면 건너뛴다.
+    # 롤백된 세이브포인트의 콜백은 Django 가 run_on_commit 에서 빼 주므로 남은 목록만 보면 된다.
+    if any(is_index_scheduled(callback, project_id) for _, callback in transaction.get_connection().run_on_commit):
+        return
+
+    transaction.on_commit(partial(index_project, project_id))
+
+def search_projects(query, offset, limit):
+    words = get_words(query)
+
+    if not words:
+        return 0, []
+
+    return get_backend().search(words, offset, limit)
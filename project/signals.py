@@ -0,0 +1,80 @@
+from django.db                import transaction
+from django.db.models         import Q
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch          import receiver
+
+from user.models              import User
+from tumbluv.lookups          import categories
+from .cache                   import invalidate_project_list, invalidate_project_detail
+from .search                  import schedule_index_project
+from .models                  import Project, Category, Gift, Story, Community
+
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def expire_project_list(sender, **kwargs):
+    # 커밋 전에 버전을 올리면 동시에 읽은 요청이 커밋 전 목록을 새 버전으로 다시 캐시한다
+    transaction.on_commit(invalidate_project_list)
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def expire_category_lookup(sender, **kwargs):
+    categories.invalidate()
+
+def expire_project_detail_on_commit(project_uris):
+    # 대상은 지금 정하고 (삭제된 행은 커밋 뒤에 찾을 수 없다) 캐시는 커밋된 뒤에 지운다.
+    # 커밋 전에 지우면 동시에 읽은 요청이 이전 내용을 DETAIL_TIMEOUT 동안 다시 캐시한다.
+    project_uris = list(project_uris)
+    transaction.on_commit(lambda: invalidate_project_detail(project_uris))
+
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+def expire_project_detail(sender, instance, **kwargs):
+    expire_project_detail_on_commit([instance.project_uri])
+
+@receiver(post_save, sender=Gift)
+@receiver(post_delete, sender=Gift)
+@receiver(post_save, sender=Story)
+@receiver(post_delete, sender=Story)
+@receiver(post_save, sender=Community)
+@receiver(post_delete, sender=Community)
+def expire_parent_project_detail(sender, instance, **kwargs):
+    expire_project_detail_on_commit(Project.objects.filter(id=instance.project_id).values_list('project_uri', flat=True))
+
+@receiver(post_save, sender=Project)
+def index_saved_project(sender, instance, raw=False, update_fields=None, **kwargs):
+    # 모금액 집계처럼 검색 필드를 건드리지 않는 저장은 다시 색인하지 않는다
+    if raw or (update_fields is not None and not {'name', 'summary'} & set(update_fields)):
+        return
+
+    schedule_index_project(instance.id)
+
+@receiver(post_save, sender=Story)
+@receiver(post_delete, sender=Story)
+def index_story_project(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+
+    schedule_index_project(instance.project_id)
+
+@receiver(pre_save, sender=User)
+def remember_user_profile(sender, instance, raw=False, **kwargs):
+    instance._profile_changed = False
+
+    if raw or instance.pk is None:
+        return
+
+    previous = User.objects.filter(pk=instance.pk).values_list('fullname', 'user_description').first()
+    instance._profile_changed = previous is not None and previous != (instance.fullname, instance.user_description)
+
+@receiver(post_save, sender=User)
+def expire_user_project_detail(sender, instance, **kwargs):
+    # 창작자 정보와 댓글 작성자 이름이 상세 페이지에 들어간다
+    if not getattr(instance, '_profile_changed', False):
+        return
+
+    commented = Community.objects.filter(user=instance).values('project_id')
+    expire_project_detail_on_commit(
+        Project.objects.filter(Q(user=instance) | Q(id__in=commented)).values_list('project_uri', flat=True)
+    )
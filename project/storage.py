@@ -0,0 +1,287 @@
+import io
+import os
+import hashlib
+import shutil
+import tempfile
+import threading
+import multiprocessing
+
+import boto3
+
+from concurrent.futures               import ThreadPoolExecutor, ProcessPoolExecutor
+
+from botocore.config                  import Config
+from boto3.s3.transfer                import TransferConfig
+from django.conf                      import settings
+from django.core.cache                import caches
+from django.db                        import close_old_connections, transaction
+from django.core.files.uploadhandler  import FileUploadHandler
+from django.dispatch                  import receiver
+from django.test.signals              import setting_changed
+
+from my_settings                      import AWS_ID, AWS_KEY
+from .images                          import Image, IMAGE_FORMATS, make_variants
+from .models                          import StoredFile
+
+UPLOAD_PENDING = 'PENDING'
+UPLOAD_DONE    = 'DONE'
+UPLOAD_FAILED  = 'FAILED'
+
+class S3Storage:
+    def __init__(self, options):
+        self.bucket   = options['BUCKET']
+        self.base_url = options['BASE_URL']
+        self.client   = boto3.client(
+            's3',
+            aws_access_key_id     = AWS_ID,
+            aws_secret_access_key = AWS_KEY,
+            config                = Config(max_pool_connections=options['MAX_POOL_CONNECTIONS'])
+        )
+        # MULTIPART_THRESHOLD 를 넘는 파일은 청크 단위 멀티파트로 스트리밍한다
+        self.transfer = TransferConfig(
+            multipart_threshold = options['MULTIPART_THRESHOLD'],
+            multipart_chunksize = options['MULTIPART_CHUNKSIZE'],
+            max_concurrency     = options['MAX_CONCURRENCY']
+        )
+
+    def save(self, fileobj, key, content_type):
+        self.client.upload_fileobj(
+            fileobj,
+            self.bucket,
+            key,
+            ExtraArgs = {"ContentType": content_type},
+            Config    = self.transfer
+        )
+
+    def url(self, key):
+        return self.base_url + key
+
+class LocalStorage:
+    def __init__(self, options):
+        self.root     = options['ROOT']
+        self.base_url = options['BASE_URL']
+
+    def save(self, fileobj, key, content_type):
+        path = os.path.join(self.root, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        with open(path, 'wb') as destination:
+            shutil.copyfileobj(fileobj, destination)
+
+    def url(self, key):
+        return self.base_url + key
+
+STORAGE_BACKENDS = {
+    's3'    : S3Storage,
+    'local' : LocalStorage,
+}
+
+storage_lock    = threading.Lock()
+storage         = None
+upload_executor = None
+image_pool      = None
+
+def get_storage():
+    global storage
+
+    if storage is None:
+        with storage_lock:
+            if storage is None:
+                options = settings.FILE_STORAGE
+                storage = STORAGE_BACKENDS[options['BACKEND']](options)
+
+    return storage
+
+def get_upload_executor():
+    global upload_executor
+
+    if upload_executor is None:
+        with storage_lock:
+            if upload_executor is None:
+                upload_executor = ThreadPoolExecutor(
+                    max_workers        = settings.FILE_STORAGE['UPLOAD_WORKERS'],
+                    thread_name_prefix = 'upload'
+                )
+
+    return upload_executor
+
+def reset_storage():
+    global storage
+    storage = None
+
+def get_image_pool():
+    global image_pool
+
+    if image_pool is None:
+        with storage_lock:
+            if image_pool is None:
+                image_pool = ProcessPoolExecutor(
+                    max_workers = settings.IMAGE_VARIANTS['WORKERS'],
+                    mp_context  = multiprocessing.get_context('spawn')
+                )
+
+    return image_pool
+
+@receiver(setting_changed)
+def file_storage_changed(setting, **kwargs):
+    if setting == 'FILE_STORAGE':
+        reset_storage()
+
+def get_status_key(key):
+    return f'upload:status:{key}'
+
+def get_upload_status(key):
+    return caches[settings.PROJECT_CACHE['ALIAS']].get(get_status_key(key))
+
+def set_upload_status(key, status):
+    caches[settings.PROJECT_CACHE['ALIAS']].set(get_status_key(key), status, settings.FILE_STORAGE['STATUS_TIMEOUT'])
+
+def get_original_key(base, extension):
+    return f'{base}/original.{extension}'
+
+def get_variant_key(base, name, extension):
+    return f'{base}/{name}.{extension}'
+
+def get_variant_base(thumbnail_url):
+    # 업로드 파이프라인을 거친 이미지만 <base>/original.<ext> 형태이고 base 는 content_hash 이다
+    base_url = settings.FILE_STORAGE['BASE_URL']
+
+    if not thumbnail_url or not thumbnail_url.startswith(base_url):
+        return None
+
+    base, _, filename = thumbnail_url[len(base_url):].rpartition('/')
+
+    if not base or not filename.startswith('original.'):
+        return None
+
+    return base
+
+def get_variant_bases(thumbnail_urls):
+    # 변환본 저장을 마친 이미지만 남긴다. 목록은 카드마다가 아니라 한 번에 조회한다
+    bases = {get_variant_base(thumbnail_url) for thumbnail_url in thumbnail_urls} - {None}
+
+    if not bases:
+        return set()
+
+    return set(StoredFile.objects.filter(content_hash__in=bases, has_variants=True).values_list('content_hash', flat=True))
+
+def get_thumbnail_variants(thumbnail_url, names, variant_bases=None):
+    base = get_variant_base(thumbnail_url)
+
+    if base is None:
+        return None
+
+    if variant_bases is None:
+        variant_bases = get_variant_bases([thumbnail_url])
+
+    return get_variant_urls(base, names) if base in variant_bases else None
+
+def get_variant_urls(base, names):
+    return {
+        name: {extension: get_storage().url(get_variant_key(base, name, extension)) for extension in IMAGE_FORMATS}
+        for name in names
+    }
+
+def save_variants(data, base):
+    if Image is None:
+        return None
+
+    options = settings.IMAGE_VARIANTS
+    future  = get_image_pool().submit(make_variants, data, options['WIDTHS'], options['QUALITY'])
+
+    try:
+        variants = future.result()
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return None
+
+    for (name, extension), content in variants.items():
+        get_storage().save(io.BytesIO(content), get_variant_key(base, name, extension), IMAGE_FORMATS[extension][1])
+
+    return get_variant_urls(base, options['WIDTHS'])
+
+def save_variants_in_background(data, base):
+    # 변환과 저장은 업로드 워커에서 하고, 끝나면 has_variants 를 켜서 카드에 노출한다
+    try:
+        if save_variants(data, base) is not None:
+            StoredFile.objects.filter(content_hash=base).update(has_variants=True)
+    finally:
+        close_old_connections()
+
+class HashingUploadHandler(FileUploadHandler):
+    # 업로드를 받는 동안 청크 단위로 sha256 을 계산하고 데이터는 다음 핸들러로 넘긴다
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.hashes = {}
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.sha256 = hashlib.sha256()
+
+    def receive_data_chunk(self, raw_data, start):
+        self.sha256.update(raw_data)
+        return raw_data
+
+    def file_complete(self, file_size):
+        self.hashes[self.field_name] = self.sha256.hexdigest()
+        return None
+
+def find_stored_image(content_hash):
+    stored = StoredFile.objects.filter(content_hash=content_hash).first()
+
+    if stored is None:
+        return None
+
+    variants = get_variant_urls(content_hash, settings.IMAGE_VARIANTS['WIDTHS']) if stored.has_variants else None
+    return get_storage().url(stored.key), variants
+
+def remember_stored_image(content_hash, key, variants):
+    StoredFile.objects.get_or_create(
+        content_hash = content_hash,
+        defaults     = {'key': key, 'has_variants': variants is not None}
+    )
+
+def upload_image(image, content_hash, extension, content_type):
+    key = get_original_key(content_hash, extension)
+
+    get_storage().save(image, key, content_type)
+    remember_stored_image(content_hash, key, None)
+
+    if Image is not None:
+        image.seek(0)
+        data = image.read()
+        transaction.on_commit(lambda: get_upload_executor().submit(save_variants_in_background, data, content_hash))
+
+    return get_storage().url(key), None
+
+def upload_spooled_image(path, content_hash, extension, content_type):
+    key = get_original_key(content_hash, extension)
+
+    try:
+        with open(path, 'rb') as spooled:
+            get_storage().save(spooled, key, content_type)
+            spooled.seek(0)
+            variants = save_variants(spooled.read(), content_hash)
+        remember_stored_image(content_hash, key, variants)
+        set_upload_status(key, UPLOAD_DONE)
+    except Exception:
+        set_upload_status(key, UPLOAD_FAILED)
+        raise
+    finally:
+        os.remove(path)
+        close_old_connections()
+
+def upload_image_in_background(image, content_hash, extension, content_type):
+    key = get_original_key(content_hash, extension)
+
+    if get_upload_status(key) == UPLOAD_PENDING:
+        return get_storage().url(key)
+
+    # 요청이 끝나면 업로드 파일이 닫히므로 임시 파일로 옮긴 뒤 워커에 넘긴다
+    with tempfile.NamedTemporaryFile(delete=False) as spooled:
+        for chunk in image.chunks():
+            spooled.write(chunk)
+
+    set_upload_status(key, UPLOAD_PENDING)
+    get_upload_executor().submit(upload_spooled_image, spooled.name, content_hash, extension, content_type)
+
+    return get_storage().url(key)
@@ -1,18 +1,30 @@
+import io
+import os
+import hashlib
 import json
+import time
+import random
+import tempfile
+import itertools
 import unittest
 import jwt
 import mock
 import datetime
 
-from django.core.files import File
+from io                import StringIO
+
+from django.core.files import File, uploadedfile
+from django.core       import management
+from django.core.exceptions import ImproperlyConfigured
 from unittest.mock     import patch, MagicMock
 from freezegun         import freeze_time
 
-from django.db         import transaction
-from django.test       import TestCase, Client
+from django.db         import transaction, connection, connections
+from django.test       import TestCase, TransactionTestCase, Client
 from django.views      import View
 from django.conf       import settings
 from django.http       import JsonResponse
+from django.test.utils import CaptureQueriesContext
 
 from my_settings       import (
     SECRET_KEY, ALGORITHM,
@@ -20,15 +32,29 @@ from my_settings       import (
 
 from user.models       import User
 from user.utils        import login_decorator
+from tumbluv.db        import build_databases, check_connections, check_replica_routing
+from tumbluv.lookups   import LookupTable, categories
 from user.models       import User
+from .cache            import get_cache, get_list_version, get_detail_cache_key
+from .images           import Image
+from .search           import get_term_frequencies, get_backend, index_project
+from .storage          import LocalStorage, reset_storage, get_thumbnail_variants
+from .views            import get_project_list
 from .models           import  (
     Category, Project, Like,
-    Gift, Story, Community
+    Gift, Story, Community, StoredFile,
+    SearchDocument, SearchTerm
 )
 
 class FileViewTest(TestCase):
 
-    @patch('project.views.boto3')
+    def setUp(self):
+        reset_storage()
+
+    def tearDown(self):
+        reset_storage()
+
+    @patch('project.storage.boto3')
     def test_file_upload_success(self, mocked_s3_client):
         self.freezer = freeze_time("2021-03-11 21:00:49.951790")
         self.freezer.start()
@@ -47,13 +73,13 @@ class FileViewTest(TestCase):
         
         self.freezer.stop()
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(
-            response.json(), {
-                "thumbnail_url" : "https://tumbluv.s3.ap-northeast-2.amazonaws.com/2021-03-11_21:00:49.951790.jpeg"
-            }
-        ) 
+        self.assertRegex(
+            response.json()["thumbnail_url"],
+            r"^https://tumbluv\.s3\.ap-northeast-2\.amazonaws\.com/[0-9a-f]{64}/original\.jpeg$"
+        )
+        self.assertIsNone(response.json()["thumbnail_variants"])
     
-    @patch('project.views.boto3')
+    @patch('project.storage.boto3')
     def test_file_upload_file_missing(self, mocked_s3_client):
         self.freezer = freeze_time("2021-03-11 21:00:49.951790")
         self.freezer.start()
@@ -79,6 +105,98 @@ class FileViewTest(TestCase):
         ) 
 
 
+    def test_thumbnail_variants_require_stored_variants(self):
+        base_url = settings.FILE_STORAGE['BASE_URL']
+
+        self.assertIsNone(get_thumbnail_variants(f'{base_url}abc123/original.png', ['card']))
+
+        StoredFile.objects.create(content_hash='abc123', key='abc123/original.png', has_variants=False)
+        self.assertIsNone(get_thumbnail_variants(f'{base_url}abc123/original.png', ['card']))
+
+        StoredFile.objects.filter(content_hash='abc123').update(has_variants=True)
+        self.assertEqual(
+            get_thumbnail_variants(f'{base_url}abc123/original.png', ['card']),
+            {'card': {'webp': f'{base_url}abc123/card.webp', 'jpeg': f'{base_url}abc123/card.jpeg'}}
+        )
+
+    def test_file_upload_skips_storage_for_same_content(self):
+        with tempfile.TemporaryDirectory() as root:
+            storage = {**settings.FILE_STORAGE, 'BACKEND': 'local', 'ROOT': root, 'BASE_URL': '/media/'}
+
+            with self.settings(FILE_STORAGE=storage), patch.object(LocalStorage, 'save', autospec=True) as save:
+                first  = self.client.post('/project/file', {
+                    'filename': uploadedfile.SimpleUploadedFile('a.png', b'same-bytes', content_type='image/png')
+                }).json()
+                second = self.client.post('/project/file', {
+                    'filename': uploadedfile.SimpleUploadedFile('b.png', b'same-bytes', content_type='image/png')
+                }).json()
+
+        self.assertEqual(first, second)
+        self.assertEqual(save.call_count, 1)
+        self.assertEqual(StoredFile.objects.get().content_hash, hashlib.sha256(b'same-bytes').hexdigest())
+
+    def test_file_upload_status_not_exist(self):
+        response = self.client.get('/project/file/unknown.png')
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json(), {'message': 'UPLOAD_NOT_EXIST'})
+
+class FileUploadBackgroundTest(TransactionTestCase):
+
+    def setUp(self):
+        reset_storage()
+
+    def tearDown(self):
+        reset_storage()
+
+    def test_file_upload_in_background(self):
+        with tempfile.TemporaryDirectory() as root:
+            storage = {**settings.FILE_STORAGE, 'BACKEND': 'local', 'ROOT': root, 'BASE_URL': '/media/'}
+
+            with self.settings(FILE_STORAGE=storage):
+                image    = uploadedfile.SimpleUploadedFile('file.png', b'image-bytes', content_type='image/png')
+                response = self.client.post('/project/file?mode=background', {'filename': image})
+                key      = response.json()['thumbnail_url'][len('/media/'):]
+
+                self.assertEqual(response.status_code, 202)
+                self.assertEqual(response.json()['status'], 'PENDING')
+
+                for _ in range(50):
+                    status = self.client.get(f'/project/file/{key}').json()['status']
+                    if status != 'PENDING':
+                        break
+                    time.sleep(0.1)
+
+                self.assertEqual(status, 'DONE')
+                with open(os.path.join(root, key), 'rb') as stored:
+                    self.assertEqual(stored.read(), b'image-bytes')
+
+    @unittest.skipIf(Image is None, 'Pillow 가 설치되어 있지 않음')
+    def test_file_upload_creates_variants_off_request(self):
+        source = io.BytesIO()
+        Image.new('RGB', (2000, 1000), (255, 0, 0)).save(source, 'JPEG')
+
+        with tempfile.TemporaryDirectory() as root:
+            storage = {**settings.FILE_STORAGE, 'BACKEND': 'local', 'ROOT': root, 'BASE_URL': '/media/'}
+
+            with self.settings(FILE_STORAGE=storage):
+                image    = uploadedfile.SimpleUploadedFile('file.jpg', source.getvalue(), content_type='image/jpeg')
+                response = self.client.post('/project/file', {'filename': image}).json()
+
+                # 변환본은 응답 뒤에 업로드 워커에서 만들어진다
+                self.assertIsNone(response['thumbnail_variants'])
+
+                for _ in range(100):
+                    variants = get_thumbnail_variants(response['thumbnail_url'], ['card'])
+                    if variants is not None:
+                        break
+                    time.sleep(0.1)
+
+                card = variants['card']['webp'][len('/media/'):]
+                with Image.open(os.path.join(root, card)) as variant:
+                    self.assertEqual((variant.format, variant.size), ('WEBP', (400, 200)))
+                    self.assertNotIn('exif', variant.info)
+
 class ProjectRegisterTest(TestCase):
     
     def setUp(self):
@@ -158,13 +276,37 @@ class ProjectRegisterTest(TestCase):
             }
         )
 
+    def test_project_register_retry_with_idempotency_key(self):
+        get_cache().clear()
+        access_token = jwt.encode({'id': 1}, SECRET_KEY, algorithm=ALGORITHM)
+        body         = {
+            'name'         : '단비랑 산책하기',
+            'summary'      : '요약',
+            'category'     : '카테고리',
+            'story'        : '<p>스토리</p>',
+            'goal_amount'  : 10000,
+            'total_amount' : 0,
+            'opening_date' : '2021-03-11',
+            'closing_date' : '2021-07-03',
+            'thumbnail_url': 'https://image.png',
+            'project_uri'  : 'retry-danbi',
+            'gifts'        : [],
+        }
+        headers = {'HTTP_Authorization': access_token, 'HTTP_IDEMPOTENCY_KEY': 'register-1'}
+
+        first = self.client.post('/project/register', json.dumps(body), content_type='application/json', **headers)
+        retry = self.client.post('/project/register', json.dumps(body), content_type='application/json', **headers)
+
+        self.assertEqual(first.json(), {'message': 'SUCCESS'})
+        self.assertEqual(retry.json(), {'message': 'SUCCESS'})
+        self.assertEqual(Project.objects.filter(project_uri='retry-danbi').count(), 1)
+
     def test_project_register_fail(self):
         user         = User.objects.get(id=1)
         access_token = jwt.encode({'id': user.id}, SECRET_KEY, algorithm=ALGORITHM)
         headers      = {'HTTP_Authorization': access_token}
         body         = {
             "name"          : "단비랑 산책하기",
-            "summary"       : "귀여운 단비와 산책 할 기회를 드려요",
             "category"      : "카테고리",
             "story"         : "<div><p>스토리</p></div>",
             "goal_amount"   : 10000000000,
@@ -243,7 +385,127 @@ class ProjectRegisterTest(TestCase):
             }
         )
 
-class TestProjectDetailView(TestCase):
+    def get_register_body(self, project_uri, gift_count):
+        return {
+            "name"          : f"단비랑 산책하기 {project_uri}",
+            "summary"       : "귀여운 단비와 산책 할 기회를 드려요",
+            "category"      : "카테고리",
+            "story"         : "<div><p>스토리</p></div>",
+            "goal_amount"   : 10000000,
+            "opening_date"  : "2013-07-03",
+            "closing_date"  : "2021-07-03",
+            "thumbnail_url" : "https://tumbluv.s3.ap-northeast-2.amazonaws.com/2021-03-10_01:02:57.219378.jpeg",
+            "project_uri"   : project_uri,
+            "gifts"         : [{
+                "gift_name"     : f"gift {i}",
+                "gift_price"    : 10000,
+                "gift_stock"    : 10,
+                "quantity_sold" : 0
+                } for i in range(gift_count)],
+            "total_amount"  : 0
+        }
+
+    def count_register_queries(self, body):
+        access_token = jwt.encode({'id': 1}, SECRET_KEY, algorithm=ALGORITHM)
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post('/project/register', json.dumps(body), content_type='application/json', HTTP_Authorization=access_token)
+
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def test_project_register_query_count_does_not_depend_on_gifts(self):
+        self.count_register_queries(self.get_register_body('warm-up', 1))
+
+        self.assertEqual(
+            self.count_register_queries(self.get_register_body('three-gifts', 3)),
+            self.count_register_queries(self.get_register_body('thirty-gifts', 30))
+        )
+        self.assertEqual(Gift.objects.filter(project__project_uri='thirty-gifts').count(), 30)
+
+    def test_project_register_invalid_category(self):
+        access_token = jwt.encode({'id': 1}, SECRET_KEY, algorithm=ALGORITHM)
+        body         = {**self.get_register_body('with-danbi', 1), 'category': '없는 카테고리'}
+        response     = self.client.post('/project/register', json.dumps(body), content_type='application/json', HTTP_Authorization=access_token)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'message': 'INVALID_CATEGORY'})
+
+    def test_project_register_ignores_client_funding(self):
+        access_token = jwt.encode({'id': 1}, SECRET_KEY, algorithm=ALGORITHM)
+        body         = self.get_register_body('with-danbi', 2)
+        body['total_amount'] = 999999
+        for gift in body['gifts']:
+            gift['quantity_sold'] = 5
+
+        response = self.client.post('/project/register', json.dumps(body), content_type='application/json', HTTP_Authorization=access_token)
+        project  = Project.objects.get(project_uri='with-danbi')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((project.total_amount, project.total_supporters, project.achieved_rate), (0, 0, 0))
+        self.assertEqual(list(project.gift_set.values_list('quantity_sold', flat=True)), [0, 0])
+
+        # 주문 합계로 다시 계산해도 같은 값이어야 한다
+        management.call_command('rebuild_project_aggregates', stdout=StringIO())
+        project.refresh_from_db()
+        self.assertEqual((project.total_amount, project.total_supporters, project.achieved_rate), (0, 0, 0))
+
+    def test_project_register_with_deleted_user(self):
+        User.objects.create(id=2, fullname='사용자2', email='email2')
+        access_token = jwt.encode({'id': 2}, SECRET_KEY, algorithm=ALGORITHM)
+        User.objects.filter(id=2).delete()
+
+        for headers in [{}, {'HTTP_IDEMPOTENCY_KEY': 'deleted'}]:
+            response = self.client.post(
+                '/project/register', json.dumps(self.get_register_body('deleted-user', 1)), content_type='application/json',
+                HTTP_Authorization=access_token, **headers
+            )
+            self.assertEqual((response.status_code, response.json()), (401, {'message': 'INVALID_USER'}))
+
+        self.assertFalse(Project.objects.filter(project_uri='deleted-user').exists())
+
+    def test_project_register_rejects_non_finite_amount(self):
+        access_token = jwt.encode({'id': 1}, SECRET_KEY, algorithm=ALGORITHM)
+
+        for amount in ['NaN', 'Infinity', '-1']:
+            body     = {**self.get_register_body('with-danbi', 1), 'goal_amount': amount}
+            response = self.client.post('/project/register', json.dumps(body), content_type='application/json', HTTP_Authorization=access_token)
+
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.json(), {'message': 'INVALID_AMOUNT'})
+
+    def test_import_projects_command(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.jsonl', encoding='utf-8') as jsonl:
+            jsonl.write(json.dumps({**self.get_register_body('imported-1', 2), 'user_id': 1}) + '\n')
+            jsonl.write(json.dumps({**self.get_register_body('imported-2', 2), 'user_id': 1}) + '\n')
+            jsonl.write(json.dumps({**self.get_register_body('imported-1', 2), 'user_id': 1}) + '\n')
+            jsonl.flush()
+
+            stdout = StringIO()
+            management.call_command('import_projects', jsonl.name, stdout=stdout, stderr=StringIO())
+
+        self.assertIn('2 projects imported, 1 failed', stdout.getvalue())
+        self.assertEqual(Gift.objects.filter(project__project_uri__startswith='imported').count(), 4)
+
+    def test_import_projects_reports_unknown_user(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.jsonl', encoding='utf-8') as jsonl:
+            jsonl.write(json.dumps({**self.get_register_body('imported-1', 1), 'user_id': 1}) + '\n')
+            jsonl.write(json.dumps({**self.get_register_body('imported-2', 1), 'user_id': 999}) + '\n')
+            jsonl.write(json.dumps({**self.get_register_body('imported-3', 1), 'user_id': 1}) + '\n')
+            jsonl.flush()
+
+            stdout = StringIO()
+            stderr = StringIO()
+            management.call_command('import_projects', jsonl.name, stdout=stdout, stderr=stderr)
+
+        self.assertIn('2 projects imported, 1 failed', stdout.getvalue())
+        self.assertIn('line 2: INVALID_USER', stderr.getvalue())
+        self.assertEqual(
+            sorted(Project.objects.filter(project_uri__startswith='imported').values_list('project_uri', flat=True)),
+            ['imported-1', 'imported-3']
+        )
+
+class TestProjectDetailView(TransactionTestCase):
     
     def setUp(self):
         self.freezer = freeze_time("2021-01-20 00:00:00")
@@ -340,6 +602,7 @@ class TestProjectDetailView(TestCase):
                         'category'         : '카테고리1',
                         'name'             : '프로젝트1',
                         'thumbnail_url'    : '사진1',
+                        'thumbnail_variants' : None,
                         'creator'          : '사용자1',
                         'achieved_rate'    : '0.50',
                         'total_amount'     : '300000.00',
@@ -372,7 +635,8 @@ class TestProjectDetailView(TestCase):
                                 'comment'    : '댓글1-1',
                                 'created_at' : datetime.datetime(2021, 1, 20, 0, 0).strftime('%Y-%m-%dT%H:%M:%S')
                                 }]
-                            }]
+                            }],
+                        'communities_next' : None
                         }
                     })
 
@@ -388,6 +652,7 @@ class TestProjectDetailView(TestCase):
                         'category'         : '카테고리1',
                         'name'             : '프로젝트1',
                         'thumbnail_url'    : '사진1',
+                        'thumbnail_variants' : None,
                         'creator'          : '사용자1',
                         'achieved_rate'    : '0.50',
                         'total_amount'     : '300000.00',
@@ -420,10 +685,75 @@ class TestProjectDetailView(TestCase):
                                 'comment'    : '댓글1-1',
                                 'created_at' : datetime.datetime(2021, 1, 20, 0, 0).strftime('%Y-%m-%dT%H:%M:%S')
                                 }]
-                            }]
+                            }],
+                        'communities_next' : None
                         }
                     })
 
+    def test_projectdetailview_query_count_does_not_depend_on_comments(self):
+        access_token = jwt.encode({'id': 1}, SECRET_KEY, algorithm=ALGORITHM)
+        headers      = {'HTTP_Authorization': access_token}
+
+        self.client.get('/project/uri', **headers)
+        get_cache().clear()
+
+        with CaptureQueriesContext(connection) as before:
+            self.client.get('/project/uri', **headers)
+
+        for i in range(10):
+            parent = Community.objects.create(user_id=1, project_id=1, comment=f'댓글{i}')
+            Community.objects.create(user_id=2, project_id=1, parent=parent, comment=f'답글{i}-1')
+            Community.objects.create(user_id=1, project_id=1, parent=parent, comment=f'답글{i}-2')
+
+        with CaptureQueriesContext(connection) as after:
+            response = self.client.get('/project/uri', **headers)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(after.captured_queries), len(before.captured_queries))
+
+        # 상세에는 댓글 첫 페이지만 싣고 나머지는 CommunityView 로 이어 읽는다
+        tab       = response.json()['tab']
+        remaining = self.client.get('/project/uri/communities', {'cursor': tab['communities_next']}).json()
+
+        self.assertEqual([community['comment'] for community in tab['communities']], [f'댓글{i}' for i in range(9, -1, -1)])
+        self.assertEqual([community['comment'] for community in remaining['results']], ['댓글1'])
+        self.assertIsNone(remaining['next'])
+
+    def test_projectdetailview_payload_is_cached_per_project(self):
+        self.client.get('/project/uri')
+
+        with self.assertNumQueries(0):
+            response = self.client.get('/project/uri')
+
+        self.assertEqual(response.json()['project_info']['like'], False)
+
+        access_token = jwt.encode({'id': 1}, SECRET_KEY, algorithm=ALGORITHM)
+        response     = self.client.get('/project/uri', HTTP_Authorization=access_token)
+        self.assertEqual(response.json()['project_info']['like'], True)
+
+    def test_projectdetailview_cache_invalidated_on_related_change(self):
+        self.client.get('/project/uri')
+
+        Gift.objects.filter(id=1).update(stock=0)
+        Gift.objects.get(id=1).save()
+        self.assertEqual(self.client.get('/project/uri').json()['project_info']['option'][0]['stock'], 0)
+
+        user          = User.objects.get(id=2)
+        user.fullname = '새이름'
+        user.save()
+        response = self.client.get('/project/uri').json()
+        self.assertEqual(response['tab']['communities'][0]['recomment'][0]['user'], '새이름')
+
+    def test_projectdetailview_cache_evicted_after_commit(self):
+        self.client.get('/project/uri')
+        key = get_detail_cache_key('uri')
+
+        with transaction.atomic():
+            Gift.objects.get(id=1).save()
+            self.assertIsNotNone(get_cache().get(key))
+
+        self.assertIsNone(get_cache().get(key))
+
     def test_projectdetailview_get_project_not_exists(self):
         project_uri = 'uri2'
         response   = self.client.get(f'/project/{project_uri}', content_type='application/json')
@@ -433,3 +763,730 @@ class TestProjectDetailView(TestCase):
                 'message': 'PROJECT_NOT_EXIST'
             }
 
+        )
+
+class ProjectViewTest(TestCase):
+
+    def setUp(self):
+        User.objects.create(
+            id       = 1,
+            fullname = '사용자1',
+            email    = 'email1'
+            )
+
+        Category.objects.create(
+            id   = 1,
+            name = '카테고리1'
+            )
+
+        for i in range(1, 8):
+            Project.objects.create(
+                id               = i,
+                user_id          = 1,
+                category_id      = 1,
+                name             = f'프로젝트{i}',
+                opening_date     = datetime.datetime(2021, 1, 1, 0, 0),
+                closing_date     = datetime.datetime(2021, 1, 31, 0, 0),
+                total_supporters = i,
+                achieved_rate    = i % 3 * 10,
+                total_amount     = i * 1000,
+                thumbnail_url    = f'사진{i}',
+                goal_amount      = 3000000.00,
+                summary          = f'프로젝트요약{i}',
+                project_uri      = f'uri{i}'
+                )
+
+    def tearDown(self):
+        User.objects.all().delete()
+        Category.objects.all().delete()
+        Project.objects.all().delete()
+
+    def test_projectview_get_offset_limit(self):
+        response = self.client.get('/project', {'offset': 2, 'limit': 3})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], 7)
+        self.assertEqual(
+            [project['project_uri'] for project in response.json()['results']],
+            ['uri3', 'uri4', 'uri5']
+        )
+
+    def test_projectview_get_cursor_walks_every_page(self):
+        for sort in ['popular', 'amount', 'endedAt', None]:
+            params = {'limit': 3, 'cursor': ''}
+            if sort:
+                params['sort'] = sort
+
+            full_page   = self.client.get('/project', {**params, 'limit': 7}).json()['results']
+            cursor_page = []
+
+            while True:
+                response = self.client.get('/project', params).json()
+                cursor_page += response['results']
+                if not response['next']:
+                    break
+                params['cursor'] = response['next']
+
+            self.assertEqual(cursor_page, full_page)
+
+    def test_projectview_get_invalid_cursor(self):
+        response = self.client.get('/project', {'sort': 'popular', 'cursor': 'invalid'})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'message': 'INVALID_CURSOR'})
+
+class ProjectListCacheTest(TransactionTestCase):
+
+    def setUp(self):
+        get_cache().clear()
+
+        User.objects.create(
+            id       = 1,
+            fullname = '사용자1',
+            email    = 'email1'
+            )
+
+        Category.objects.create(
+            id   = 1,
+            name = '카테고리1'
+            )
+
+        self.create_project(1)
+
+    def tearDown(self):
+        User.objects.all().delete()
+        Category.objects.all().delete()
+        Project.objects.all().delete()
+
+    def create_project(self, i):
+        Project.objects.create(
+            id            = i,
+            user_id       = 1,
+            category_id   = 1,
+            name          = f'프로젝트{i}',
+            opening_date  = datetime.datetime(2021, 1, 1, 0, 0),
+            closing_date  = datetime.datetime(2021, 1, 31, 0, 0),
+            achieved_rate = 0,
+            total_amount  = 0,
+            thumbnail_url = f'사진{i}',
+            goal_amount   = 3000000.00,
+            summary       = f'프로젝트요약{i}',
+            project_uri   = f'uri{i}'
+            )
+
+    def test_projectview_anonymous_listing_is_cached(self):
+        first = self.client.get('/project', {'sort': 'popular', 'limit': 12})
+
+        with self.assertNumQueries(0):
+            second = self.client.get('/project', {'limit': '12', 'sort': 'popular', 'offset': 0})
+
+        self.assertEqual(second.json(), first.json())
+
+    def test_projectview_cache_invalidated_on_project_create(self):
+        self.assertEqual(self.client.get('/project').json()['count'], 1)
+
+        self.create_project(2)
+
+        self.assertEqual(self.client.get('/project').json()['count'], 2)
+
+    def test_projectview_cache_invalidated_after_commit(self):
+        version = get_list_version()
+
+        with transaction.atomic():
+            self.create_project(2)
+            self.assertEqual(get_list_version(), version)
+
+        self.assertEqual(get_list_version(), version + 1)
+
+class ProjectViewQueryCountTest(TestCase):
+
+    def setUp(self):
+        User.objects.create(
+            id       = 1,
+            fullname = '사용자1',
+            email    = 'email1'
+            )
+
+        Category.objects.create(
+            id   = 1,
+            name = '카테고리1'
+            )
+
+        # 카테고리 이름 조회 테이블은 프로세스당 한 번만 읽으므로 미리 채워 둔다
+        categories.get_name(1)
+
+    def tearDown(self):
+        User.objects.all().delete()
+        Category.objects.all().delete()
+        Project.objects.all().delete()
+
+    def create_projects(self, count):
+        start = Project.objects.count() + 1
+
+        for i in range(start, start + count):
+            Project.objects.create(
+                user_id          = 1,
+                category_id      = 1,
+                name             = f'프로젝트{i}',
+                opening_date     = datetime.datetime(2021, 1, 1, 0, 0),
+                closing_date     = datetime.datetime(2021, 1, 31, 0, 0),
+                total_supporters = i,
+                achieved_rate    = i,
+                total_amount     = i * 1000,
+                thumbnail_url    = f'사진{i}',
+                goal_amount      = 3000000.00,
+                summary          = f'프로젝트요약{i}',
+                project_uri      = f'uri{i}'
+                )
+
+    def count_queries(self, params):
+        get_cache().clear()
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get('/project', params)
+
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def test_projectview_query_count_is_constant(self):
+        for params in [{}, {'sort': 'popular'}, {'sort': 'amount', 'cursor': ''}]:
+            self.create_projects(1)
+            expected = self.count_queries(params)
+
+            self.create_projects(10)
+            self.assertEqual(self.count_queries(params), expected)
+
+class CommunityViewTest(TestCase):
+
+    def setUp(self):
+        User.objects.create(
+            id       = 1,
+            fullname = '사용자1',
+            email    = 'email1'
+            )
+
+        Category.objects.create(
+            id   = 1,
+            name = '카테고리1'
+            )
+
+        Project.objects.create(
+            id            = 1,
+            user_id       = 1,
+            category_id   = 1,
+            name          = '프로젝트1',
+            opening_date  = datetime.datetime(2021, 1, 1, 0, 0),
+            closing_date  = datetime.datetime(2021, 1, 31, 0, 0),
+            thumbnail_url = '사진1',
+            goal_amount   = 3000000.00,
+            summary       = '프로젝트요약1',
+            project_uri   = 'uri'
+            )
+
+        for i in range(1, 6):
+            Community.objects.create(id=i, user_id=1, project_id=1, comment=f'댓글{i}')
+
+        for i in range(6, 11):
+            Community.objects.create(id=i, user_id=1, project_id=1, parent_id=5, comment=f'답글{i}')
+
+    def tearDown(self):
+        User.objects.all().delete()
+        Category.objects.all().delete()
+        Project.objects.all().delete()
+        Community.objects.all().delete()
+
+    def test_communityview_get_newest_first_with_reply_preview(self):
+        response = self.client.get('/project/uri/communities', {'limit': 2, 'replies': 2})
+        results  = response.json()['results']
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([community['id'] for community in results], [5, 4])
+        self.assertEqual(results[0]['reply_count'], 5)
+        self.assertEqual([reply['id'] for reply in results[0]['recomment']], [6, 7])
+        self.assertEqual(results[1]['recomment'], [])
+
+        response = self.client.get('/project/uri/communities', {'limit': 2, 'cursor': response.json()['next']})
+        self.assertEqual([community['id'] for community in response.json()['results']], [3, 2])
+
+    def test_communityview_get_project_not_exists(self):
+        response = self.client.get('/project/uri2/communities')
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json(), {'message': 'PROJECT_NOT_EXIST'})
+
+    def test_communityview_reply_preview_query_does_not_depend_on_replies(self):
+        def count_queries():
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get('/project/uri/communities', {'limit': 2, 'replies': 2})
+            self.assertEqual([reply['id'] for reply in response.json()['results'][0]['recomment']], [6, 7])
+            return len(context.captured_queries)
+
+        before = count_queries()
+        Community.objects.bulk_create([Community(user_id=1, project_id=1, parent_id=5, comment='답글') for _ in range(300)])
+
+        self.assertEqual(count_queries(), before)
+
+    def test_replyview_get_pages(self):
+        response = self.client.get('/project/uri/communities/5/replies', {'limit': 3})
+        self.assertEqual([reply['id'] for reply in response.json()['results']], [6, 7, 8])
+
+        response = self.client.get('/project/uri/communities/5/replies', {'limit': 3, 'cursor': response.json()['next']})
+        self.assertEqual([reply['id'] for reply in response.json()['results']], [9, 10])
+        self.assertIsNone(response.json()['next'])
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN 형식은 SQLite 기준')
+class ProjectListIndexTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        rnd   = random.Random(1)
+        today = datetime.datetime.today()
+
+        User.objects.bulk_create([User(fullname=f'사용자{i}', email=f'email{i}') for i in range(300)])
+        Category.objects.bulk_create([Category(name=f'카테고리{i}') for i in range(8)])
+
+        users      = list(User.objects.values_list('id', flat=True))
+        categories = list(Category.objects.values_list('id', flat=True))
+
+        Project.objects.bulk_create([Project(
+            user_id          = rnd.choice(users),
+            category_id      = rnd.choice(categories),
+            name             = f'프로젝트{i}',
+            opening_date     = today + datetime.timedelta(days=rnd.randint(-400, 60)),
+            closing_date     = today + datetime.timedelta(days=rnd.randint(-300, 120)),
+            total_supporters = rnd.randint(0, 1000),
+            achieved_rate    = rnd.randint(0, 300),
+            total_amount     = rnd.randint(0, 200000000),
+            thumbnail_url    = f'사진{i}',
+            goal_amount      = 3000000.00,
+            summary          = f'프로젝트요약{i}',
+            project_uri      = f'uri{i}'
+            ) for i in range(5000)])
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def test_projectview_filters_and_sorts_use_indexes(self):
+        category_id = Category.objects.values_list('id', flat=True).first()
+        combinations = itertools.product(
+            [None, category_id],
+            [None, 'all', 'onGoing', 'confirm', 'prelaunching'],
+            [None, 'under75', 'under100', '100up'],
+            [None, 'all', 'under1m', 'under10m', 'under50m', 'under100m', '100mup'],
+            [None, 'popular', 'publishedAt', 'pledges', 'amount', 'endedAt'],
+        )
+
+        for category, status, achieve, money, sort in combinations:
+            params = {
+                key: value for key, value in [
+                    ('category', category), ('status', status), ('achieve', achieve),
+                    ('money', money), ('sort', sort)
+                ] if value
+            }
+
+            # 조건이 하나도 없으면 기본 키 순서로 앞쪽 limit 개만 읽는다
+            if not params:
+                continue
+
+            projects, ordering = get_project_list(params)
+            plan               = projects[:12].explain()
+            sort_field         = ordering.lstrip('-')
+
+            # 정렬을 위해 걸린 행을 모두 읽는 계획(임시 B-TREE), users 를 바깥에 둔 조인, 정렬 순서가 아닌 SCAN 을 막는다.
+            # projects 를 SCAN 하는 건 정렬 인덱스(id 정렬이면 기본 키)를 순서대로 따라가다 LIMIT 에서 멈출 때뿐이다
+            ordered_scans = {'SCAN projects'} if sort_field == 'id' else {
+                f'SCAN projects USING INDEX {index.name}'
+                for index in Project._meta.indexes if index.fields[0] == sort_field
+            }
+            scans = [line.split(' ', 3)[-1].strip() for line in plan.splitlines() if ' SCAN ' in f' {line} ']
+
+            with self.subTest(params=params):
+                self.assertNotIn('TEMP B-TREE', plan)
+                self.assertTrue(set(scans) <= ordered_scans, plan)
+
+    def test_unindexed_filters_match_plain_lookups(self):
+        today       = datetime.datetime.today()
+        projects, _ = get_project_list({'status': 'onGoing', 'achieve': 'under100', 'money': 'under50m', 'sort': 'pledges'})
+        expected    = Project.objects.filter(
+            opening_date__lte  = today,
+            closing_date__gte  = today,
+            achieved_rate__gte = 75,
+            achieved_rate__lte = 100,
+            total_amount__gt   = 10000000,
+            total_amount__lte  = 50000000
+        ).order_by('-total_supporters', '-id')
+
+        self.assertTrue(expected.exists())
+        self.assertEqual([project.id for project in projects], list(expected.values_list('id', flat=True)))
+
+class DatabaseSettingsTest(TestCase):
+    MYSQL = {'ENGINE': 'django.db.backends.mysql', 'NAME': 'tumbluv', 'HOST': 'primary'}
+
+    def test_persistent_connections_from_env(self):
+        with patch.dict(os.environ, {'DB_CONN_MAX_AGE': '300', 'DB_REPLICA_HOST': 'replica-host'}):
+            databases = build_databases({'default': self.MYSQL})
+
+        self.assertEqual(databases['default']['CONN_MAX_AGE'], 300)
+        self.assertTrue(databases['default']['CONN_HEALTH_CHECKS'])
+        self.assertEqual(databases['default']['OPTIONS'], {'connect_timeout': 5})
+        self.assertEqual(databases['replica']['HOST'], 'replica-host')
+        self.assertEqual(databases['replica']['TEST'], {'MIRROR': 'default'})
+        self.assertNotIn('CONN_MAX_AGE', self.MYSQL)
+
+    def test_replica_requires_shared_sticky_cache(self):
+        databases = {'default': self.MYSQL, 'replica': self.MYSQL}
+        routing   = {'REPLICA': 'replica', 'CACHE_ALIAS': 'default'}
+        locmem    = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+        redis     = {'default': {'BACKEND': 'django_redis.cache.RedisCache'}}
+
+        with self.assertRaises(ImproperlyConfigured):
+            check_replica_routing(databases, locmem, routing)
+
+        check_replica_routing(databases, redis, routing)
+        check_replica_routing({'default': self.MYSQL}, locmem, routing)
+
+    def test_without_replica(self):
+        with patch.dict(os.environ, {}, clear=True):
+            databases = build_databases({'default': self.MYSQL})
+
+        self.assertEqual(list(databases), ['default'])
+        self.assertEqual(databases['default']['CONN_MAX_AGE'], 60)
+
+    def test_unusable_connection_closed_on_request_started(self):
+        connection.ensure_connection()
+
+        with patch.object(connection, 'is_usable', return_value=False), patch.object(connection, 'close') as mocked_close:
+            check_connections()
+
+        mocked_close.assert_called_once_with()
+
+class ReplicaRoutingTest(TransactionTestCase):
+    REPLICA = 'replica_test'
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        # 두 번째 SQLite 파일을 replica 로 붙여서 실제로 다른 DB 에서 읽는지 확인한다
+        cls.replica_dir = tempfile.TemporaryDirectory()
+        connections.databases[cls.REPLICA] = {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME'  : os.path.join(cls.replica_dir.name, 'replica.sqlite3'),
+        }
+        connections.ensure_defaults(cls.REPLICA)
+        connections.prepare_test_settings(cls.REPLICA)
+        management.call_command('migrate', database=cls.REPLICA, verbosity=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        connections[cls.REPLICA].close()
+        delattr(connections._connections, cls.REPLICA)
+        del connections.databases[cls.REPLICA]
+        cls.replica_dir.cleanup()
+        super().tearDownClass()
+
+    def setUp(self):
+        get_cache().clear()
+
+        for alias in ['default', self.REPLICA]:
+            User.objects.using(alias).create(id=1, fullname='사용자1', email='email1')
+            Category.objects.using(alias).create(id=1, name='카테고리1')
+            Project.objects.using(alias).create(
+                id           = 1,
+                user_id      = 1,
+                category_id  = 1,
+                name         = alias,
+                opening_date = datetime.datetime(2021, 1, 1),
+                closing_date = datetime.datetime(2021, 1, 31),
+                goal_amount      = 3000000,
+                total_amount     = 0,
+                total_supporters = 0,
+                achieved_rate    = 0,
+                project_uri      = 'uri1'
+            )
+
+        self.routing = self.settings(DATABASE_ROUTING={**settings.DATABASE_ROUTING, 'REPLICA': self.REPLICA})
+        self.routing.enable()
+
+    def tearDown(self):
+        self.routing.disable()
+
+        for model in [Project, Category, User]:
+            model.objects.using(self.REPLICA).all().delete()
+
+    def get_names(self, **headers):
+        return [project['name'] for project in self.client.get('/project', **headers).json()['results']]
+
+    def test_list_reads_from_replica(self):
+        # 로그인한 요청은 목록 캐시를 거치지 않고 replica 에서 읽는다
+        self.assertEqual(self.get_names(HTTP_Authorization=jwt.encode({'id': 1}, SECRET_KEY, algorithm=ALGORITHM)), [self.REPLICA])
+
+    def test_list_cache_filled_from_primary(self):
+        self.assertEqual(self.get_names(), ['default'])
+
+        # replica 가 아직 따라오지 못해도 버전이 오른 뒤의 캐시는 primary 의 새 목록으로 채워진다
+        Project.objects.filter(id=1).update(name='고친 이름')
+        Project.objects.get(id=1).save()
+        self.assertEqual(self.get_names(), ['고친 이름'])
+
+    def test_falls_back_to_primary_without_replica(self):
+        with self.settings(DATABASE_ROUTING={**settings.DATABASE_ROUTING, 'REPLICA': 'missing'}):
+            self.assertEqual(self.get_names(), ['default'])
+
+    def test_detail_cache_filled_from_primary(self):
+        Story.objects.create(project_id=1, content='<p>스토리</p>')
+        response = self.client.get('/project/uri1')
+
+        self.assertEqual(response.json()['project_info']['name'], 'default')
+
+    def test_reads_stick_to_primary_after_own_write(self):
+        token = jwt.encode({'id': 1}, SECRET_KEY, algorithm=ALGORITHM)
+        body  = {
+            'name'         : '새 프로젝트',
+            'summary'      : '요약',
+            'category'     : '카테고리1',
+            'story'        : '<p>스토리</p>',
+            'goal_amount'  : 1000000,
+            'opening_date' : '2021-01-01',
+            'closing_date' : '2021-01-31',
+            'thumbnail_url': 'https://image.png',
+            'project_uri'  : 'new-project',
+            'gifts'        : [],
+            'total_amount' : 0,
+        }
+        response = self.client.post('/project/register', json.dumps(body), content_type='application/json', HTTP_Authorization=token)
+        self.assertEqual(response.json(), {'message': 'SUCCESS'})
+
+        self.assertEqual(self.get_names(HTTP_Authorization=token), ['default', '새 프로젝트'])
+        self.assertEqual(self.get_names(HTTP_Authorization=jwt.encode({'id': 2}, SECRET_KEY, algorithm=ALGORITHM)), [self.REPLICA])
+
+    def test_invalid_token_reads_as_anonymous(self):
+        expired = jwt.encode({'id': 1, 'exp': datetime.datetime(2020, 1, 1)}, SECRET_KEY, algorithm=ALGORITHM)
+        other   = jwt.encode({'id': 1}, SECRET_KEY, algorithm='HS512')
+
+        self.assertEqual(self.get_names(HTTP_Authorization=expired), [self.REPLICA])
+        self.assertEqual(self.get_names(HTTP_Authorization=other), [self.REPLICA])
+        self.assertEqual(self.get_names(HTTP_Authorization='not-a-token'), [self.REPLICA])
+
+class CategoryLookupTest(TestCase):
+    def setUp(self):
+        get_cache().clear()
+
+        User.objects.create(id=1, fullname='사용자1', email='email1')
+        Category.objects.create(id=1, name='카테고리1')
+        Category.objects.create(id=2, name='카테고리2')
+
+        for i, category_id in enumerate([1, 2, 2], 1):
+            Project.objects.create(
+                id               = i,
+                user_id          = 1,
+                category_id      = category_id,
+                name             = f'프로젝트{i}',
+                opening_date     = datetime.datetime(2021, 1, 1),
+                closing_date     = datetime.datetime(2021, 1, 31),
+                goal_amount      = 3000000,
+                total_amount     = 0,
+                total_supporters = 0,
+                achieved_rate    = 0,
+                project_uri      = f'uri{i}'
+            )
+
+    def test_projectview_category_filter_accepts_name_or_id(self):
+        by_name = self.client.get('/project', {'category': '카테고리2'}).json()
+        by_id   = self.client.get('/project', {'category': 2}).json()
+
+        self.assertEqual(by_name, by_id)
+        self.assertEqual([project['category'] for project in by_name['results']], ['카테고리2', '카테고리2'])
+        self.assertEqual(self.client.get('/project', {'category': '없는카테고리'}).json(), {'count': 0, 'results': []})
+
+    def test_lookup_without_queries_once_loaded(self):
+        categories.get_id('카테고리1')
+
+        with self.assertNumQueries(0):
+            self.assertEqual(categories.get_id('카테고리2'), 2)
+            self.assertEqual(categories.get_name(1), '카테고리1')
+
+    def test_local_save_reloads_immediately(self):
+        categories.get_id('카테고리1')
+        Category.objects.filter(id=1).update(name='임시')
+
+        category      = Category.objects.get(id=1)
+        category.name = '바뀐이름'
+        category.save()
+
+        self.assertEqual(categories.get_name(1), '바뀐이름')
+        self.assertIsNone(categories.get_id('카테고리1'))
+
+    def test_other_workers_reload_on_version_bump(self):
+        worker = LookupTable('project.Category', 'name')
+
+        with self.settings(LOOKUP_TABLES={**settings.LOOKUP_TABLES, 'CHECK_INTERVAL': 0}):
+            self.assertEqual(worker.get_name(1), '카테고리1')
+            Category.objects.filter(id=1).update(name='바뀐이름')
+
+            with self.assertNumQueries(0):
+                self.assertEqual(worker.get_name(1), '카테고리1')
+
+            categories.bump_shared_version()
+            self.assertEqual(worker.get_name(1), '바뀐이름')
+
+    def test_other_workers_reload_after_max_age_without_shared_version(self):
+        # 프로세스별 캐시라 버전이 전해지지 않는 워커
+        worker = LookupTable('project.Category', 'name')
+        self.assertEqual(worker.get_name(1), '카테고리1')
+
+        Category.objects.filter(id=1).update(name='바뀐이름')
+        self.assertEqual(worker.get_name(1), '카테고리1')
+
+        with patch('tumbluv.lookups.time.monotonic', return_value=time.monotonic() + settings.LOOKUP_TABLES['MAX_AGE']):
+            self.assertEqual(worker.get_name(1), '바뀐이름')
+
+class ProjectSearchTest(TransactionTestCase):
+    # 색인은 커밋된 뒤에 갱신되므로 on_commit 이 실행되는 TransactionTestCase 로 확인한다
+    def setUp(self):
+        get_cache().clear()
+
+        User.objects.create(id=1, fullname='사용자1', email='email1')
+        Category.objects.create(id=1, name='카테고리1')
+
+        self.create_project(1, '고양이 간식 만들기', '수제 간식', '강아지도 좋아해요')
+        self.create_project(2, '여행 에세이', '바다 사진', '고양이를 데리고 떠난 여행')
+        self.create_project(3, '강아지 산책 가방', '튼튼한 가방', '양이 많은 고구마 간식')
+
+    def create_project(self, id, name, summary, story):
+        project = Project.objects.create(
+            id               = id,
+            user_id          = 1,
+            category_id      = 1,
+            name             = name,
+            opening_date     = datetime.datetime(2021, 1, 1),
+            closing_date     = datetime.datetime(2021, 1, 31),
+            goal_amount      = 3000000,
+            total_amount     = 0,
+            total_supporters = 0,
+            achieved_rate    = 0,
+            thumbnail_url    = f'사진{id}',
+            summary          = summary,
+            project_uri      = f'uri{id}'
+        )
+        Story.objects.create(project=project, content=story)
+        return project
+
+    def search(self, **params):
+        return self.client.get('/project/search', params)
+
+    def test_search_ranks_title_matches_first_with_project_cards(self):
+        response = self.search(q='고양이')
+        cards    = response.json()['results']
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], 2)
+        self.assertEqual([card['project_uri'] for card in cards], ['uri1', 'uri2'])
+        self.assertEqual(cards[0], self.client.get('/project', {'limit': 1}).json()['results'][0])
+
+    def test_search_requires_every_word_in_order(self):
+        # '고구' 와 '구마' 가 따로 있어도 '고구마' 로 이어져 있지 않으면 찾지 않는다
+        story         = Story.objects.get(project_id=1)
+        story.content = '강아지와 고구려 구마'
+        story.save()
+        self.assertEqual(SearchTerm.objects.filter(project_id=1, term__in=['고구', '구마']).count(), 2)
+
+        self.assertEqual([card['project_uri'] for card in self.search(q='간식 강아지').json()['results']], ['uri1', 'uri3'])
+        self.assertEqual([card['project_uri'] for card in self.search(q='고구마').json()['results']], ['uri3'])
+        self.assertEqual(self.search(q='고양이 가방').json(), {'count': 0, 'results': []})
+
+    def test_search_paginates(self):
+        first  = self.search(q='간식', limit=1).json()
+        second = self.search(q='간식', limit=1, offset=1).json()
+
+        self.assertEqual((first['count'], second['count']), (2, 2))
+        self.assertEqual([card['project_uri'] for card in first['results'] + second['results']], ['uri1', 'uri3'])
+
+    def test_search_rejects_short_query(self):
+        self.assertEqual(self.search(q='고').json(), {'message': 'INVALID_QUERY'})
+        self.assertEqual(self.search().status_code, 400)
+
+    def test_index_follows_project_and_story_changes(self):
+        project         = Project.objects.get(id=2)
+        project.name    = '바다 여행'
+        project.save()
+
+        story         = Story.objects.get(project_id=2)
+        story.content = '혼자 떠난 여행'
+        story.save()
+
+        document = SearchDocument.objects.get(project_id=2)
+        self.assertEqual((document.title, document.body), ('바다 여행\n바다 사진', '혼자 떠난 여행'))
+        self.assertEqual(
+            dict(SearchTerm.objects.filter(project_id=2).values_list('term', 'frequency')),
+            dict(get_term_frequencies(document.title, document.body))
+        )
+        self.assertEqual(self.search(q='고양이').json()['count'], 1)
+        self.assertEqual(self.search(q='혼자').json()['count'], 1)
+
+    def test_index_strips_story_html(self):
+        story         = Story.objects.get(project_id=2)
+        story.content = '<p class="highlight">고양이&amp;강아지</p><p>산책<img src="sea.png"></p>'
+        story.save()
+
+        self.assertEqual(SearchDocument.objects.get(project_id=2).body.split(), ['고양이&강아지', '산책'])
+        self.assertEqual(self.search(q='highlight').json()['count'], 0)
+        self.assertEqual(self.search(q='강아지산책').json()['count'], 0)
+        self.assertEqual([card['project_uri'] for card in self.search(q='산책').json()['results']], ['uri3', 'uri2'])
+
+    def test_search_ranks_and_paginates_in_one_query(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(get_backend().search(['간식'], 1, 1), (2, [3]))
+
+    def test_story_changes_index_project_once_per_transaction(self):
+        with patch('project.search.index_project', wraps=index_project) as index:
+            with transaction.atomic():
+                project      = Project.objects.get(id=1)
+                project.name = '고양이 간식 굽기'
+                project.save()
+
+                for content in ['첫째 날', '둘째 날', '셋째 날']:
+                    Story.objects.create(project=project, content=content)
+
+                self.assertEqual(index.call_count, 0)
+
+        index.assert_called_once_with(1)
+        self.assertIn('셋째 날', SearchDocument.objects.get(project_id=1).body)
+
+    def test_rolled_back_savepoint_does_not_skip_reindex(self):
+        with transaction.atomic():
+            try:
+                with transaction.atomic():
+                    Story.objects.create(project_id=1, content='사라질 이야기')
+                    raise ValueError
+            except ValueError:
+                pass
+
+            Story.objects.filter(project_id=1).update(content='남는 이야기')
+            Story.objects.get(project_id=1).save()
+
+        self.assertEqual(SearchDocument.objects.get(project_id=1).body, '남는 이야기')
+
+    def test_aggregate_save_skips_reindex(self):
+        project              = Project.objects.get(id=1)
+        project.total_amount = 1000
+
+        with self.assertNumQueries(1):
+            project.save(update_fields=['total_amount'])
+
+    def test_deleted_project_leaves_no_index(self):
+        Project.objects.get(id=1).delete()
+
+        self.assertFalse(SearchDocument.objects.filter(project_id=1).exists())
+        self.assertFalse(SearchTerm.objects.filter(project_id=1).exists())
+        self.assertEqual([card['project_uri'] for card in self.search(q='간식').json()['results']], ['uri3'])
+
+    def test_rebuild_search_index(self):
+        SearchDocument.objects.all().delete()
+        SearchTerm.objects.all().delete()
+
+        out = StringIO()
+        management.call_command('rebuild_search_index', stdout=out)
+
+        self.assertEqual(out.getvalue().strip(), '3 projects indexed')
+        self.assertEqual(self.search(q='고양이').json()['count'], 2)
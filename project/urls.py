@@ -1,12 +1,17 @@
 from django.urls import path
 
 from .views import (
-    FileUpload, RegisterView, ProjectDetailView, ProjectView
+    FileUpload, RegisterView, ProjectDetailView, ProjectView,
+    CommunityView, ReplyView, FileUploadStatusView, ProjectSearchView
 )
 
 urlpatterns = [
     path('/register', RegisterView.as_view()),
     path('/file', FileUpload.as_view()),
+    path('/file/<path:key>', FileUploadStatusView.as_view()),
+    path('/search', ProjectSearchView.as_view()),
     path('/<project_uri>', ProjectDetailView.as_view()),
+    path('/<project_uri>/communities', CommunityView.as_view()),
+    path('/<project_uri>/communities/<int:community_id>/replies', ReplyView.as_view()),
     path('', ProjectView.as_view())
 ]
@@ -0,0 +1,55 @@
+import json
+import base64
+import datetime
+
+from django.db.models             import Q, Transform, DateTimeField, DecimalField
+from django.core.serializers.json import DjangoJSONEncoder
+
+class Unindexed(Transform):
+    # 함수로 감싼 컬럼에는 플래너가 인덱스를 쓰지 않는다 (SQLite, MySQL 공통).
+    # 정렬 컬럼이 아닌 조건에 붙여서 범위로 찾은 뒤 전부 정렬하는 대신 정렬 인덱스를 따라 읽으며 거르게 한다.
+    lookup_name = 'unindexed'
+    function    = 'COALESCE'
+    template    = '%(function)s(%(expressions)s, NULL)'
+
+DateTimeField.register_lookup(Unindexed)
+DecimalField.register_lookup(Unindexed)
+
+class CursorEncoder(DjangoJSONEncoder):
+    # DjangoJSONEncoder 는 마이크로초를 잘라내므로 커서에는 전체 정밀도를 유지한다
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+def encode_cursor(ordering, project):
+    field  = ordering.lstrip('-')
+    values = [ordering, getattr(project, field), project.id]
+    return base64.urlsafe_b64encode(json.dumps(values, cls=CursorEncoder).encode('utf-8')).decode('utf-8')
+
+def decode_cursor(ordering, cursor):
+    try:
+        key, value, pk = json.loads(base64.urlsafe_b64decode(cursor.encode('utf-8')))
+    except (TypeError, ValueError):
+        raise ValueError('INVALID_CURSOR')
+
+    if key != ordering or not isinstance(pk, int):
+        raise ValueError('INVALID_CURSOR')
+
+    return value, pk
+
+def keyset_filter(ordering, value, pk):
+    field      = ordering.lstrip('-')
+    descending = ordering.startswith('-')
+    after_pk   = 'id__lt' if descending else 'id__gt'
+
+    if field == 'id':
+        return Q(**{after_pk: pk})
+
+    # NULL 은 가장 작은 값으로 정렬된다 (MySQL, SQLite 공통)
+    if value is None:
+        q = Q(**{field + '__isnull': True, after_pk: pk})
+        return q if descending else q | Q(**{field + '__isnull': False})
+
+    q = Q(**{field + ('__lt' if descending else '__gt'): value}) | Q(**{field: value, after_pk: pk})
+    return (q | Q(**{field + '__isnull': True})) if descending else q
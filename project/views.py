@@ -1,258 +1,463 @@
 import json
-import boto3
 
-from datetime         import date, datetime, timedelta
-
-from django.db        import transaction
-from django.db        import IntegrityError
-from django.views     import View
-from django.db.models import Q
-from django.conf      import settings
-from django.http      import JsonResponse
-from django.utils     import timezone
-
-from my_settings      import (
-    SECRET_KEY, ALGORITHM,
-    AWS_ID    , AWS_KEY
-)
-
-from user.models      import User
-from user.utils       import login_decorator, user_decorator
-from user.models      import User
-from .models          import  (
-    Category, Project, Like,
-    Gift, Story, Community
+from datetime                    import datetime, timedelta
+
+from django.db                   import IntegrityError
+from django.views                import View
+from django.db.models            import Q, Count, OuterRef, Prefetch, Subquery
+from django.db.models.expressions import RawSQL
+from django.conf                 import settings
+from django.http                 import JsonResponse
+from django.utils                import timezone
+
+from user.models                 import User
+from user.utils                  import login_decorator, user_decorator
+from tumbluv.idempotency         import idempotent
+from tumbluv.lookups             import categories
+from tumbluv.routers             import use_replica, use_primary
+from .cache                      import cache_project_list, get_cache, get_detail_cache_key
+from .storage                    import (
+    UPLOAD_PENDING, UPLOAD_DONE, HashingUploadHandler,
+    get_storage, get_upload_status, get_thumbnail_variants, get_variant_bases, find_stored_image,
+    upload_image, upload_image_in_background
 )
+from .registration               import RegistrationError, parse_project, register_project
+from .search                     import get_words, search_projects
+from .utils                      import encode_cursor, decode_cursor, keyset_filter
+from .models                     import Project, Like, Gift, Community
      
 class RegisterView(View):   
     @login_decorator
+    @idempotent
     def post(self, request):
         data    = json.loads(request.body)
         user_id = request.user.id
 
         try:
-            with transaction.atomic():
-                name          = data['name']
-                thumbnail_url = data['thumbnail_url']
-                summary       = data['summary']
-                category      = data['category']
-                story         = data['story']
-                goal_amount   = data['goal_amount']
-                total_amount  = data['total_amount']
-                opening_date  = data['opening_date']
-                closing_date  = data['closing_date']
-                project_uri   = data['project_uri']
-                gifts         = data['gifts']
-
-                category_id = Category.objects.get(name=category).id
-
-                project = Project.objects.create(
-                    category_id   = category_id,
-                    user_id       = user_id,
-                    name          = name,
-                    opening_date  = datetime.strptime(opening_date,'%Y-%m-%d'),
-                    closing_date  = datetime.strptime(closing_date,'%Y-%m-%d'),
-                    thumbnail_url = thumbnail_url,
-                    goal_amount   = goal_amount,
-                    total_amount  = total_amount,
-                    summary       = summary,
-                    project_uri   = project_uri
-                )
-
-                Story.objects.create(
-                    content    = story,
-                    project_id = project.id
-                    )
-
-                for gift in gifts: 
-                    Gift.objects.create(
-                        name          = gift['gift_name'],
-                        price         = gift['gift_price'],
-                        stock         = gift['gift_stock'],
-                        project_id    = project.id,
-                        quantity_sold = gift['quantity_sold']
-                    )
-
-                return JsonResponse({'message': 'SUCCESS'}, status=200)
+            project = parse_project(data)
+            register_project(user_id, project)
+
+            return JsonResponse({'message': 'SUCCESS'}, status=200)
 
         except KeyError:
             return JsonResponse({'message': 'KEY_ERROR'}, status=400)
+
+        except RegistrationError as error:
+            return JsonResponse({'message': error.message}, status=400)
             
         except IntegrityError:
             return JsonResponse({"message": "DUPLICATED_ENTRY"}, status=400)
 
 class FileUpload(View):
     def post(self, request):
-        s3_client = boto3.client(
-        's3',
-        aws_access_key_id     = AWS_ID,
-        aws_secret_access_key = AWS_KEY
-    )
-        
+        hashing = HashingUploadHandler(request)
+        request.upload_handlers.insert(0, hashing)
+
         try:
-            image       = request.FILES['filename']
-            upload_time = (str(datetime.now())).replace(" ", "_")
-            image_type  = (image.content_type).split("/")[1]
-            
-            s3_client.upload_fileobj(
-                image,
-                "tumbluv",
-                upload_time+"."+image_type,
-                ExtraArgs={
-                    "ContentType": image.content_type
-                }
-            )
-
-            image_url = "https://tumbluv.s3.ap-northeast-2.amazonaws.com/" + upload_time + "." + image_type
-            image_url = image_url.replace(" ", "")
+            image        = request.FILES['filename']
+            image_type   = (image.content_type).split("/")[1]
+            content_hash = hashing.hashes['filename']
+            background   = request.GET.get('mode') == 'background'
+            stored       = find_stored_image(content_hash)
+
+            if stored and background:
+                return JsonResponse({"thumbnail_url": stored[0], "status": UPLOAD_DONE}, status=200)
+
+            if stored:
+                return JsonResponse({"thumbnail_url": stored[0], "thumbnail_variants": stored[1]}, status=200)
+
+            if background:
+                image_url = upload_image_in_background(image, content_hash, image_type, image.content_type)
+                return JsonResponse({"thumbnail_url": image_url, "status": UPLOAD_PENDING}, status=202)
+
+            image_url, variants = upload_image(image, content_hash, image_type, image.content_type)
             
-            return JsonResponse({"thumbnail_url": image_url}, status=200)
+            return JsonResponse({"thumbnail_url": image_url, "thumbnail_variants": variants}, status=200)
         
-        except:
+        except (KeyError, IndexError):
             return JsonResponse({'message': 'FILE_NOT_ATTACHED'}, status=400)
 
+class FileUploadStatusView(View):
+    def get(self, request, key):
+        status = get_upload_status(key)
+
+        if status is None:
+            return JsonResponse({'message': 'UPLOAD_NOT_EXIST'}, status=404)
+
+        return JsonResponse({'status': status, 'thumbnail_url': get_storage().url(key)}, status=200)
+
+COMMENT_ORDERING = '-created_at'
+COMMENT_LIMIT    = 10
+REPLY_LIMIT      = 3
+
+def load_project_detail(project_uri):
+    projects = Project.objects.select_related('user').prefetch_related(
+        Prefetch('gift_set', queryset=Gift.objects.order_by('id')),
+        'story_set',
+    )
+
+    return projects.get(project_uri=project_uri)
+
+def get_reply_previews(parent_ids, reply_limit):
+    # 댓글마다 앞쪽 reply_limit 개의 답글만 ROW_NUMBER 로 골라 한 번의 쿼리로 가져온다.
+    # 답글마다 앞선 답글 수를 세면 답글 수의 제곱에 비례하므로 창 함수로 한 번만 훑는다
+    if not parent_ids:
+        return {}
+
+    first_replies = RawSQL(
+        'SELECT id FROM ('
+        'SELECT id, ROW_NUMBER() OVER (PARTITION BY parent_id ORDER BY id) AS position '
+        f'FROM {Community._meta.db_table} WHERE parent_id IN ({", ".join(["%s"] * len(parent_ids))})'
+        ') replies WHERE position <= %s',
+        [*parent_ids, reply_limit]
+    )
+
+    previews = {}
+    for reply in Community.objects.filter(id__in=first_replies).select_related('user').order_by('id'):
+        previews.setdefault(reply.parent_id, []).append(reply)
+
+    return previews
+
+def get_community_page(project_id, limit, reply_limit, after=None):
+    communities = Community.objects.filter(project_id=project_id, parent=None).select_related('user').annotate(
+        reply_count=Count('community')
+    ).order_by(COMMENT_ORDERING, '-id')
+
+    if after:
+        communities = communities.filter(keyset_filter(COMMENT_ORDERING, *after))
+
+    page        = list(communities[:limit + 1])
+    next_cursor = encode_cursor(COMMENT_ORDERING, page[limit - 1]) if len(page) > limit else None
+
+    return page[:limit], get_reply_previews([community.id for community in page[:limit]], reply_limit), next_cursor
+
+def get_project_detail(project_uri):
+    cache   = get_cache()
+    key     = get_detail_cache_key(project_uri)
+    payload = cache.get(key)
+
+    if payload is not None:
+        return payload
+
+    today = datetime.now()
+
+    # 상세 캐시는 오래 살아 있으므로 복제 지연이 섞이지 않게 primary 에서 채운다.
+    # 댓글은 첫 페이지만 싣고 나머지는 communities_next 커서로 CommunityView 에서 이어 읽는다
+    with use_primary():
+        project                         = load_project_detail(project_uri)
+        communities, replies, next_page = get_community_page(project.id, COMMENT_LIMIT, REPLY_LIMIT)
+
+    project_info = {
+        'category'           : categories.get_name(project.category_id),
+        'name'               : project.name,
+        'thumbnail_url'      : project.thumbnail_url,
+        'thumbnail_variants' : get_thumbnail_variants(project.thumbnail_url, ['detail', 'retina']),
+        'creator'            : project.user.fullname,
+        'achieved_rate'      : project.achieved_rate,
+        'total_amount'       : project.total_amount,
+        'rest_date'          : (project.closing_date - today).days,
+        'total_supporters'   : project.total_supporters,
+        'goal_amount'        : project.goal_amount,
+        'payment_date'       : project.closing_date + timedelta(days=1),
+        'option'             : [{
+            'id'          : option.id,
+            'description' : option.name,
+            'money'       : option.price,
+            'people'      : option.quantity_sold,
+            'stock'       : option.stock,
+            } for option in project.gift_set.all()],
+        }
+
+    creator_info = {
+        'name'                : project.user.fullname,
+        'creator_description' : project.user.user_description
+        }
+
+    tab = {
+        'story'  : project.story_set.all()[0].content,
+        'communities' : [{
+            'user'       : community.user.fullname,
+            'comment'    : community.comment,
+            'past_date'  : (today-community.updated_at).days,
+            'created_at' : community.created_at,
+            'recomment'  : [{
+                'user'       : recomment.user.fullname,
+                'comment'    : recomment.comment,
+                'created_at' : recomment.created_at
+                } for recomment in replies[community.id]
+                ] if community.id in replies else ''
+            } for community in communities
+            ] if communities else '',
+        'communities_next' : next_page
+        }
+
+    payload = {
+        'project_id'   : project.id,
+        'project_info' : project_info,
+        'creator_info' : creator_info,
+        'tab'          : tab
+        }
+
+    cache.set(key, payload, settings.PROJECT_CACHE['DETAIL_TIMEOUT'])
+    return payload
+
+def get_project_detail_response(project_uri, user):
+    try:
+        payload = get_project_detail(project_uri)
+    except Project.DoesNotExist:
+        return JsonResponse({'message': 'PROJECT_NOT_EXIST'}, status=404)
+
+    like = user is not None and Like.objects.filter(
+        project_id=payload['project_id'], user_id=user.id
+    ).exists()
+
+    return JsonResponse({
+        'project_info': {**payload['project_info'], 'like': like},
+        'creator_info': payload['creator_info'],
+        'tab'         : payload['tab']
+        }, status=200)
+
 class ProjectDetailView(View):
     @user_decorator
+    @use_replica
+    def get(self, request, project_uri):
+        return get_project_detail_response(project_uri, request.user)
+
+def get_community_reply(reply):
+    return {
+        'id'         : reply.id,
+        'user'       : reply.user.fullname,
+        'comment'    : reply.comment,
+        'created_at' : reply.created_at
+        }
+
+class CommunityView(View):
     def get(self, request, project_uri):
-        today = datetime.now()
+        limit        = int(request.GET.get('limit', COMMENT_LIMIT))
+        reply_limit  = int(request.GET.get('replies', REPLY_LIMIT))
+        cursor       = request.GET.get('cursor', None)
+        today        = datetime.now()
 
-        if not Project.objects.filter(project_uri=project_uri).exists():
+        try:
+            project_id = Project.objects.values_list('id', flat=True).get(project_uri=project_uri)
+        except Project.DoesNotExist:
             return JsonResponse({'message': 'PROJECT_NOT_EXIST'}, status=404)
 
-        project = Project.objects.get(project_uri=project_uri)
-
-        project_info = {
-            'category'         : project.category.name,
-            'name'             : project.name,
-            'thumbnail_url'    : project.thumbnail_url,
-            'creator'          : project.user.fullname,
-            'achieved_rate'    : project.achieved_rate,
-            'total_amount'     : project.total_amount,
-            'rest_date'        : (project.closing_date - today).days,
-            'total_supporters' : project.total_supporters,
-            'goal_amount'      : project.goal_amount,
-            'payment_date'     : project.closing_date + timedelta(days=1),
-            'like'             : False if (request.user is None or not project.like_set.filter(user_id=request.user.id).exists()) else True,
-            'option'           : [{
-                'id'          : option.id,
-                'description' : option.name,
-                'money'       : option.price,
-                'people'      : option.quantity_sold,
-                'stock'       : option.stock,
-                } for option in project.gift_set.all()],
-            }
-
-        creator_info = {
-            'name'                : project.user.fullname,
-            'creator_description' : project.user.user_description
-            }
-
-        tab = {
-            'story'  : project.story_set.get(project_id=project.id).content,
-            'communities' : [{
-                'user'       : community.user.fullname,
-                'comment'    : community.comment,
-                'past_date'  : (today-community.updated_at).days,
-                'created_at' : community.created_at,
-                'recomment'  : [{
-                    'user'       : recomment.user.fullname,
-                    'comment'    : recomment.comment,
-                    'created_at' : recomment.created_at
-                    } for recomment in community.community_set.all()
-                    ] if community.community_set.exists() else ''
-                } for community in project.community_set.filter(parent_id=None).order_by('-created_at')
-                ] if project.community_set.exists() else ''
-            }
+        try:
+            after = decode_cursor(COMMENT_ORDERING, cursor) if cursor else None
+        except ValueError:
+            return JsonResponse({'message': 'INVALID_CURSOR'}, status=400)
+
+        communities, replies, next_page = get_community_page(project_id, limit, reply_limit, after)
 
         return JsonResponse({
-            'project_info': project_info,
-            'creator_info': creator_info,
-            'tab'         : tab
+            'results' : [{
+                'id'          : community.id,
+                'user'        : community.user.fullname,
+                'comment'     : community.comment,
+                'past_date'   : (today-community.updated_at).days,
+                'created_at'  : community.created_at,
+                'reply_count' : community.reply_count,
+                'recomment'   : [get_community_reply(reply) for reply in replies.get(community.id, [])]
+                } for community in communities],
+            'next'    : next_page
             }, status=200)
 
-class ProjectView(View):
-    def get(self, request):
-        offset = int(request.GET.get('offset', 0))
-        limit = int(request.GET.get('limit', 12))
-        category = request.GET.get('category', None)
-        status = request.GET.get('status', 0)
-        achieve = request.GET.get('achieve', None)
-        money = request.GET.get('money', 0)
-        ordering = request.GET.get('sort', None)
-        
-        q = Q()
+class ReplyView(View):
+    def get(self, request, project_uri, community_id):
+        limit  = int(request.GET.get('limit', 10))
+        cursor = request.GET.get('cursor', None)
 
-        if category:
-            q &= Q(category=category)
+        if not Community.objects.filter(id=community_id, parent=None, project__project_uri=project_uri).exists():
+            return JsonResponse({'message': 'COMMUNITY_NOT_EXIST'}, status=404)
 
-        if status == 'all':
-            q.add(Q(opening_date__gte=datetime.today()), q.AND)
+        replies = Community.objects.filter(parent_id=community_id).select_related('user').order_by('id')
 
-        if status == 'onGoing':
-            q.add(Q(opening_date__lte=datetime.today()), q.AND)
-            q.add(Q(closing_date__gte=datetime.today()), q.AND)
+        if cursor:
+            try:
+                value, pk = decode_cursor('id', cursor)
+            except ValueError:
+                return JsonResponse({'message': 'INVALID_CURSOR'}, status=400)
+            replies = replies.filter(keyset_filter('id', value, pk))
 
-        if status == 'confirm':
-            q &= Q(achieved_rate__gte=100)
+        page = list(replies[:limit + 1])
 
-        if status == 'prelaunching':
-            q &= Q(opening_date__gt=datetime.today())
+        return JsonResponse({
+            'results' : [get_community_reply(reply) for reply in page[:limit]],
+            'next'    : encode_cursor('id', page[limit - 1]) if len(page) > limit else None
+            }, status=200)
 
-        if achieve == 'under75':
-            q &= Q(achieved_rate__lte=75)
+SORT_FIELDS = {
+    'popular'     : '-achieved_rate',
+    'publishedAt' : '-opening_date',
+    'pledges'     : '-total_supporters',
+    'amount'      : '-total_amount',
+    'endedAt'     : 'closing_date',
+}
+
+PROJECT_CARD_FIELDS = [
+    'thumbnail_url', 'name', 'summary', 'project_uri',
+    'total_amount', 'achieved_rate', 'total_supporters',
+    'opening_date', 'closing_date',
+    'category',
+]
+
+def select_project_cards(projects):
+    # users 를 조인하면 플래너가 users 를 바깥 테이블로 두고 projects 를 모두 읽어 정렬하므로
+    # 창작자 이름은 LIMIT 안에 든 행마다 기본 키로 한 번씩 찾는 상관 서브쿼리로 가져온다
+    return projects.only(*PROJECT_CARD_FIELDS).annotate(
+        user_fullname = Subquery(User.objects.filter(id=OuterRef('user_id')).values('fullname')[:1])
+    )
 
-        if achieve == 'under100':
-            q.add(Q(achieved_rate__gte=75), q.AND)
-            q.add(Q(achieved_rate__lte=100), q.AND)
+def get_project_cards(projects):
+    variant_bases = get_variant_bases([project.thumbnail_url for project in projects])
+    return [get_project_card(project, variant_bases) for project in projects]
 
-        if achieve == '100up':
-            q &= Q(achieved_rate__gte=100)
+def get_project_card(project, variant_bases=None):
+    return {
+        'thumbnail_url': project.thumbnail_url,
+        'thumbnail_variants': get_thumbnail_variants(project.thumbnail_url, ['card'], variant_bases),
+        'name': project.name,
+        'category': categories.get_name(project.category_id),
+        'user': project.user_fullname,
+        'summary': project.summary,
+        'total_amount': int(project.total_amount),
+        'achieved_rate': int(project.achieved_rate),
+        'days_left': (project.closing_date - timezone.now()).days,
+        'project_uri': project.project_uri,
+        }
 
-        if money == 'all':
-            q &= Q(total_amount__gte=0)
+def parse_category_filter(category):
+    # 숫자는 예전처럼 id 로, 그 밖의 값은 카테고리 이름으로 받는다
+    if str(category).isdigit():
+        return int(category)
+    return categories.get_id(category)
 
-        if money == 'under1m':
-            q &= Q(total_amount__lte=1000000)
+def get_project_list(params):
+    category = params.get('category', None)
+    status = params.get('status', 0)
+    achieve = params.get('achieve', None)
+    money = params.get('money', 0)
 
-        if money == 'under10m':
-            q.add(Q(total_amount__gt=1000000), q.AND)
-            q.add(Q(total_amount__lte=10000000), q.AND)
+    q = Q()
+    conditions = []
 
-        if money == 'under50m':
-            q.add(Q(total_amount__gt=10000000), q.AND)
-            q.add(Q(total_amount__lte=50000000), q.AND)
+    if category:
+        category_id = parse_category_filter(category)
+        q &= Q(category_id=category_id) if category_id is not None else Q(pk__in=[])
 
-        if money == 'under100m':
-            q.add(Q(total_amount__gt=50000000), q.AND)
-            q.add(Q(total_amount__lte=100000000), q.AND)
+    if status == 'all':
+        conditions.append(('opening_date__gte', datetime.today()))
 
-        if money == '100mup':
-            q &= Q(total_amount__gt=100000000)
-            
-        projects = Project.objects.filter(q)
-
-        if ordering == 'popular':
-            projects = projects.order_by('-achieved_rate')
-        if ordering == 'publishedAt':
-            projects = projects.order_by('-opening_date')
-        if ordering == 'pledges':
-            projects = projects.order_by('-total_supporters')
-        if ordering == 'amount':
-            projects = projects.order_by('-total_amount')
-        if ordering == 'endedAt':
-            projects = projects.order_by('closing_date')
-
-        project_list = [{
-            'thumbnail_url': project.thumbnail_url,
-            'name': project.name,
-            'category': project.category.name,
-            'user': project.user.fullname,
-            'summary': project.summary,
-            'total_amount': int(project.total_amount),
-            'achieved_rate': int(project.achieved_rate),
-            'days_left': (project.closing_date - timezone.now()).days,
-            'project_uri': project.project_uri,
-            # 'islike': project.like_set.get(project=project)
-            } for project in projects][offset:offset+limit]
-
-        return JsonResponse({'count': projects.count(), 'results': project_list}, status=200)
\ No newline at end of file
+    if status == 'onGoing':
+        conditions.append(('opening_date__lte', datetime.today()))
+        conditions.append(('closing_date__gte', datetime.today()))
+
+    if status == 'confirm':
+        conditions.append(('achieved_rate__gte', 100))
+
+    if status == 'prelaunching':
+        conditions.append(('opening_date__gt', datetime.today()))
+
+    if achieve == 'under75':
+        conditions.append(('achieved_rate__lte', 75))
+
+    if achieve == 'under100':
+        conditions.append(('achieved_rate__gte', 75))
+        conditions.append(('achieved_rate__lte', 100))
+
+    if achieve == '100up':
+        conditions.append(('achieved_rate__gte', 100))
+
+    if money == 'all':
+        conditions.append(('total_amount__gte', 0))
+
+    if money == 'under1m':
+        conditions.append(('total_amount__lte', 1000000))
+
+    if money == 'under10m':
+        conditions.append(('total_amount__gt', 1000000))
+        conditions.append(('total_amount__lte', 10000000))
+
+    if money == 'under50m':
+        conditions.append(('total_amount__gt', 10000000))
+        conditions.append(('total_amount__lte', 50000000))
+
+    if money == 'under100m':
+        conditions.append(('total_amount__gt', 50000000))
+        conditions.append(('total_amount__lte', 100000000))
+
+    if money == '100mup':
+        conditions.append(('total_amount__gt', 100000000))
+
+    ordering   = SORT_FIELDS.get(params.get('sort'), 'id')
+    sort_field = ordering.lstrip('-')
+
+    # 범위 조건은 정렬 컬럼에만 인덱스를 쓴다. 다른 컬럼 인덱스로 찾으면 걸린 행을 모두 읽어 정렬해야 하므로
+    # 정렬 인덱스(카테고리가 있으면 category 로 시작하는 인덱스)를 따라 읽으면서 거르고 LIMIT 에서 멈춘다
+    for lookup, value in conditions:
+        field, operator = lookup.split('__')
+        q &= Q(**{lookup if field == sort_field else f'{field}__unindexed__{operator}': value})
+
+    projects = select_project_cards(Project.objects.filter(q))
+
+    if ordering == 'id':
+        projects = projects.order_by('id')
+    else:
+        projects = projects.order_by(ordering, '-id' if ordering.startswith('-') else 'id')
+
+    return projects, ordering
+
+def get_project_list_response(params):
+    offset = int(params.get('offset', 0))
+    limit = int(params.get('limit', 12))
+
+    projects, ordering = get_project_list(params)
+
+    if 'cursor' in params:
+        cursor = params['cursor']
+
+        if cursor:
+            try:
+                value, pk = decode_cursor(ordering, cursor)
+            except ValueError:
+                return JsonResponse({'message': 'INVALID_CURSOR'}, status=400)
+            projects = projects.filter(keyset_filter(ordering, value, pk))
+
+        page = list(projects[:limit + 1])
+
+        return JsonResponse({
+            'results' : get_project_cards(page[:limit]),
+            'next'    : encode_cursor(ordering, page[limit - 1]) if len(page) > limit else None
+            }, status=200)
+
+    project_list = get_project_cards(projects[offset:offset+limit])
+
+    return JsonResponse({'count': projects.count(), 'results': project_list}, status=200)
+
+class ProjectView(View):
+    @use_replica
+    @cache_project_list
+    def get(self, request):
+        return get_project_list_response(request.GET)
+
+def get_project_search_response(params):
+    query  = params.get('q', '')
+    offset = int(params.get('offset', 0))
+    limit  = int(params.get('limit', 12))
+
+    if not get_words(query):
+        return JsonResponse({'message': 'INVALID_QUERY'}, status=400)
+
+    count, project_ids = search_projects(query, offset, limit)
+    projects           = select_project_cards(Project.objects.filter(id__in=project_ids)).in_bulk()
+
+    return JsonResponse({
+        'count'   : count,
+        'results' : get_project_cards([projects[project_id] for project_id in project_ids if project_id in projects])
+        }, status=200)
+
+class ProjectSearchView(View):
+    @use_replica
+    def get(self, request):
+        return get_project_search_response(request.GET)
@@ -0,0 +1,58 @@
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals    import request_started
+from django.db              import connections
+
+PROCESS_LOCAL_CACHES = [
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+]
+
+def get_env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+def build_databases(databases):
+    # 요청마다 새 연결을 맺지 않도록 CONN_MAX_AGE 초 동안 스레드별 연결을 재사용한다.
+    # Django 는 워커 스레드마다 연결 하나를 유지하므로 풀 크기는 (워커 수 x 스레드 수) 가 된다.
+    conn_max_age  = get_env_int('DB_CONN_MAX_AGE', 60)
+    health_checks = os.environ.get('DB_CONN_HEALTH_CHECKS', '1') == '1'
+    databases     = {alias: dict(config) for alias, config in databases.items()}
+
+    replica_host = os.environ.get('DB_REPLICA_HOST')
+    if replica_host and 'replica' not in databases:
+        databases['replica'] = {**databases['default'], 'HOST': replica_host}
+
+    for alias, config in databases.items():
+        config.setdefault('CONN_MAX_AGE', conn_max_age)
+        config.setdefault('CONN_HEALTH_CHECKS', health_checks)
+
+        if config['ENGINE'].endswith('mysql'):
+            config['OPTIONS'] = {'connect_timeout': get_env_int('DB_CONNECT_TIMEOUT', 5), **config.get('OPTIONS', {})}
+
+    # 테스트에서는 replica 가 default 를 그대로 바라본다
+    if 'replica' in databases:
+        databases['replica'].setdefault('TEST', {'MIRROR': 'default'})
+
+    return databases
+
+def check_replica_routing(databases, caches, routing):
+    # 방금 쓴 사용자 표시는 다음 요청을 받는 다른 워커도 봐야 하므로 replica 를 쓰면 공유 캐시가 있어야 한다
+    if routing['REPLICA'] in databases and caches[routing['CACHE_ALIAS']]['BACKEND'] in PROCESS_LOCAL_CACHES:
+        raise ImproperlyConfigured(
+            f"DATABASE_ROUTING['CACHE_ALIAS'] ({routing['CACHE_ALIAS']}) must be a cache shared by all workers "
+            'when a replica is configured. Set REDIS_URL.'
+        )
+
+def check_connections(**kwargs):
+    # 재사용하는 연결이 서버 쪽에서 끊겼으면 요청 시작 전에 닫아서 새로 연결하게 한다
+    for connection in connections.all():
+        if (
+            connection.connection is not None
+            and connection.settings_dict.get('CONN_HEALTH_CHECKS')
+            and not connection.is_usable()
+        ):
+            connection.close()
+
+request_started.connect(check_connections)
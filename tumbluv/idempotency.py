@@ -0,0 +1,101 @@
+import hashlib
+import datetime
+
+from functools    import wraps
+
+from django.conf  import settings
+from django.db    import IntegrityError, transaction
+from django.http  import HttpResponse, JsonResponse
+from django.utils import timezone
+
+from user.models  import IdempotencyKey
+
+def get_idempotency_key(request, key):
+    # 같은 사용자가 다른 엔드포인트에 같은 키를 보내도 섞이지 않게 범위를 넣는다
+    scope = f'{request.method}:{request.path}:{key}'
+    return hashlib.sha256(scope.encode('utf-8')).hexdigest()
+
+def get_fingerprint(request):
+    return hashlib.sha256(request.body).hexdigest()
+
+def is_expired(stored, now):
+    # 끝난 응답은 TIMEOUT 동안 돌려주고, 처리 중 표시는 워커가 죽었을 수도 있으니 LOCK_TIMEOUT 이 지나면 넘겨받는다
+    timeout = settings.IDEMPOTENCY['LOCK_TIMEOUT' if stored.status_code is None else 'TIMEOUT']
+    return stored.created_at <= now - datetime.timedelta(seconds=timeout)
+
+def replay(stored, fingerprint):
+    if stored is None or stored.status_code is None:
+        response = JsonResponse({'message': 'REQUEST_IN_PROGRESS'}, status=409)
+        response['Retry-After'] = '1'
+        return response
+
+    if stored.fingerprint != fingerprint:
+        return JsonResponse({'message': 'IDEMPOTENCY_KEY_REUSED'}, status=422)
+
+    response = HttpResponse(bytes(stored.content), content_type=stored.content_type, status=stored.status_code)
+    response['Idempotent-Replayed'] = 'true'
+    return response
+
+def claim(user_id, key, fingerprint):
+    # (user, key) 유니크 제약이 있어서 여러 워커에 동시에 들어온 재시도 중 하나만 INSERT 에 성공한다
+    now    = timezone.now()
+    stored = IdempotencyKey.objects.filter(user_id=user_id, key=key).first()
+
+    if stored is not None:
+        if not is_expired(stored, now):
+            return None, stored
+        IdempotencyKey.objects.filter(id=stored.id, created_at=stored.created_at).delete()
+
+    try:
+        with transaction.atomic():
+            return IdempotencyKey.objects.create(user_id=user_id, key=key, fingerprint=fingerprint, created_at=now), None
+    except IntegrityError:
+        return None, IdempotencyKey.objects.filter(user_id=user_id, key=key).first()
+
+def idempotent(func):
+    # login_decorator 뒤에 붙인다. 키는 공유 DB 의 idempotency_keys 테이블에 저장해서 모든 워커가 같이 본다
+    @wraps(func)
+    def wrapper(self, request, *args, **kwargs):
+        user_id = getattr(getattr(request, 'user', None), 'id', None)
+
+        if 'Idempotency-Key' not in request.headers or user_id is None:
+            return func(self, request, *args, **kwargs)
+
+        key         = get_idempotency_key(request, request.headers['Idempotency-Key'])
+        fingerprint = get_fingerprint(request)
+
+        claimed, stored = claim(user_id, key, fingerprint)
+        if claimed is None:
+            return replay(stored, fingerprint)
+
+        try:
+            response = func(self, request, *args, **kwargs)
+        except Exception:
+            claimed.delete()
+            raise
+
+        # 서버 오류는 저장하지 않아서 재시도가 다시 실행되게 한다
+        if response.status_code >= 500:
+            claimed.delete()
+            return response
+
+        IdempotencyKey.objects.filter(id=claimed.id).update(
+            status_code  = response.status_code,
+            content      = response.content,
+            content_type = response['Content-Type'],
+        )
+
+        return response
+    return wrapper
+
+def purge_idempotency_keys(batch_size):
+    cutoff  = timezone.now() - datetime.timedelta(seconds=settings.IDEMPOTENCY['TIMEOUT'])
+    expired = IdempotencyKey.objects.filter(created_at__lte=cutoff)
+    total   = 0
+
+    # 한 번에 지우면 테이블 락이 길어지므로 나눠서 지운다
+    while True:
+        ids = list(expired.values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return total
+        total += IdempotencyKey.objects.filter(id__in=ids).delete()[0]
@@ -0,0 +1,92 @@
+import time
+import threading
+
+from django.apps       import apps
+from django.conf       import settings
+from django.core.cache import caches
+from django.db         import transaction
+
+class LookupTable:
+    # 작은 코드 테이블을 프로세스 안에 들고 이름 <-> id 를 dict 로 바로 찾는다.
+    # 다른 워커의 변경은 CACHE_ALIAS 캐시의 버전 번호로 알아채고, CHECK_INTERVAL 초마다 한 번만 확인한다.
+    # 버전 번호는 그 캐시가 워커끼리 공유될 때(Redis 등)만 전해지므로, 기본값인 프로세스별 LocMemCache 에서도
+    # 이름이 바뀐 행이 계속 남지 않게 MAX_AGE 초가 지나면 버전과 상관없이 다시 읽는다.
+    def __init__(self, model, field):
+        self.model      = model
+        self.field      = field
+        self.ids        = {}
+        self.names      = {}
+        self.version    = None
+        self.checked_at = 0
+        self.loaded_at  = 0
+        self.lock       = threading.Lock()
+
+    def get_cache(self):
+        return caches[settings.LOOKUP_TABLES['CACHE_ALIAS']]
+
+    def get_version_key(self):
+        return f'lookup:{self.model}:version'
+
+    def get_shared_version(self):
+        return self.get_cache().get_or_set(self.get_version_key(), 0, None)
+
+    def load(self, version):
+        model = apps.get_model(self.model)
+        rows  = list(model.objects.values_list('id', self.field))
+
+        self.ids, self.names = {name: id for id, name in rows}, dict(rows)
+        self.version         = version
+        self.loaded_at       = time.monotonic()
+
+    def refresh(self, force=False):
+        now     = time.monotonic()
+        expired = now - self.loaded_at >= settings.LOOKUP_TABLES['MAX_AGE']
+
+        if not force and not expired and self.version is not None and now - self.checked_at < settings.LOOKUP_TABLES['CHECK_INTERVAL']:
+            return
+
+        version = self.get_shared_version()
+
+        with self.lock:
+            if force or expired or version != self.version:
+                self.load(version)
+            self.checked_at = now
+
+    def reload_on_miss(self):
+        # 없는 이름으로 반복해서 조회해도 DB 를 CHECK_INTERVAL 에 한 번만 다시 읽는다
+        if time.monotonic() - self.loaded_at >= settings.LOOKUP_TABLES['CHECK_INTERVAL']:
+            self.refresh(force=True)
+
+    def get_id(self, name):
+        self.refresh()
+
+        if name not in self.ids:
+            self.reload_on_miss()
+
+        return self.ids.get(name)
+
+    def get_name(self, id):
+        self.refresh()
+
+        if id is not None and id not in self.names:
+            self.reload_on_miss()
+
+        return self.names.get(id)
+
+    def get_ids(self, names):
+        return [id for id in (self.get_id(name) for name in names) if id is not None]
+
+    def bump_shared_version(self):
+        cache = self.get_cache()
+        try:
+            cache.incr(self.get_version_key())
+        except ValueError:
+            cache.set(self.get_version_key(), 1, None)
+
+    def invalidate(self):
+        # 이 프로세스는 바로 다시 읽고, 다른 워커에는 커밋된 뒤에 알린다
+        self.version = None
+        transaction.on_commit(self.bump_shared_version)
+
+categories = LookupTable('project.Category', 'name')
+statuses   = LookupTable('order.Status', 'status')
@@ -0,0 +1,109 @@
+import jwt
+import asyncio
+
+from contextlib              import contextmanager
+from contextvars             import ContextVar
+from functools               import wraps
+
+from asgiref.sync            import sync_to_async
+
+from django.conf             import settings
+from django.core.cache       import caches
+from django.utils.decorators import sync_and_async_middleware
+
+from my_settings             import SECRET_KEY, ALGORITHM
+
+# 요청마다 middleware 와 use_replica 가 값을 설정하고 끝나면 되돌린다
+read_replica  = ContextVar('read_replica', default=False)
+wrote_primary = ContextVar('wrote_primary', default=False)
+
+def get_replica_alias():
+    alias = settings.DATABASE_ROUTING['REPLICA']
+    return alias if alias in settings.DATABASES else None
+
+def get_user_id(request):
+    user = getattr(request, 'user', None)
+    if user is not None:
+        return user.id
+
+    try:
+        return jwt.decode(request.headers['Authorization'], SECRET_KEY, ALGORITHM)['id']
+    except (KeyError, jwt.InvalidTokenError):
+        # 만료되거나 잘못된 토큰은 익명 요청으로 본다
+        return None
+
+def get_sticky_key(user_id):
+    return f'db:sticky:{user_id}'
+
+def is_sticky(user_id):
+    cache = caches[settings.DATABASE_ROUTING['CACHE_ALIAS']]
+    return user_id is not None and cache.get(get_sticky_key(user_id)) is not None
+
+def stick_to_primary(user_id):
+    # 복제 지연 동안은 방금 쓴 사용자가 자기 데이터를 primary 에서 읽게 한다
+    cache = caches[settings.DATABASE_ROUTING['CACHE_ALIAS']]
+    cache.set(get_sticky_key(user_id), True, settings.DATABASE_ROUTING['STICKY_SECONDS'])
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if read_replica.get():
+            return get_replica_alias()
+        return None
+
+    def db_for_write(self, model, **hints):
+        wrote_primary.set(True)
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+def stick_after_write(request):
+    user_id = get_user_id(request)
+    if user_id is not None:
+        stick_to_primary(user_id)
+
+@sync_and_async_middleware
+def read_your_writes_middleware(get_response):
+    if asyncio.iscoroutinefunction(get_response):
+        async def middleware(request):
+            token = wrote_primary.set(False)
+            try:
+                response = await get_response(request)
+                if wrote_primary.get():
+                    await sync_to_async(stick_after_write)(request)
+                return response
+            finally:
+                wrote_primary.reset(token)
+        return middleware
+
+    def middleware(request):
+        token = wrote_primary.set(False)
+        try:
+            response = get_response(request)
+            if wrote_primary.get():
+                stick_after_write(request)
+            return response
+        finally:
+            wrote_primary.reset(token)
+    return middleware
+
+def use_replica(func):
+    @wraps(func)
+    def wrapper(self, request, *args, **kwargs):
+        if get_replica_alias() is None or is_sticky(get_user_id(request)):
+            return func(self, request, *args, **kwargs)
+
+        token = read_replica.set(True)
+        try:
+            return func(self, request, *args, **kwargs)
+        finally:
+            read_replica.reset(token)
+    return wrapper
+
+@contextmanager
+def use_primary():
+    token = read_replica.set(False)
+    try:
+        yield
+    finally:
+        read_replica.reset(token)
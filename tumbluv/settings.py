@@ -1,7 +1,10 @@
 
+import os
 from pathlib import Path
 import my_settings
 
+from tumbluv.db import build_databases, check_replica_routing
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -41,7 +44,8 @@ MIDDLEWARE = [
     # 'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'corsheaders.middleware.CorsMiddleware' 
+    'corsheaders.middleware.CorsMiddleware',
+    'tumbluv.routers.read_your_writes_middleware',
 ]
 
 ROOT_URLCONF = 'tumbluv.urls'
@@ -68,7 +72,72 @@ WSGI_APPLICATION = 'tumbluv.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/3.1/ref/settings/#databases
 
-DATABASES = my_settings.DATABASES
+DATABASES = build_databases(my_settings.DATABASES)
+
+# 읽기 전용 목록/상세는 replica 로 보내고, 방금 쓴 사용자는 STICKY_SECONDS 동안 primary 에서 읽는다
+DATABASE_ROUTERS = ['tumbluv.routers.ReplicaRouter']
+
+DATABASE_ROUTING = {
+    'REPLICA'       : 'replica',
+    'CACHE_ALIAS'   : 'default',
+    'STICKY_SECONDS': 5,
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/3.1/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# REDIS_URL 이 있으면 워커끼리 캐시를 공유한다 (django-redis)
+if getattr(my_settings, 'REDIS_URL', None):
+    CACHES['default'] = {
+        'BACKEND' : 'django_redis.cache.RedisCache',
+        'LOCATION': my_settings.REDIS_URL,
+    }
+
+check_replica_routing(DATABASES, CACHES, DATABASE_ROUTING)
+
+PROJECT_CACHE = {
+    'ALIAS'         : 'default',
+    'LIST_TIMEOUT'  : 60,
+    'DETAIL_TIMEOUT': 300,
+}
+
+# 업로드 파일 저장소 (BACKEND: s3 | local)
+FILE_STORAGE = {
+    'BACKEND'              : 's3',
+    'BUCKET'               : 'tumbluv',
+    'BASE_URL'             : 'https://tumbluv.s3.ap-northeast-2.amazonaws.com/',
+    'ROOT'                 : BASE_DIR / 'media',
+    'MAX_POOL_CONNECTIONS' : 20,
+    'MULTIPART_THRESHOLD'  : 8 * 1024 * 1024,
+    'MULTIPART_CHUNKSIZE'  : 8 * 1024 * 1024,
+    'MAX_CONCURRENCY'      : 4,
+    'UPLOAD_WORKERS'       : 4,
+    'STATUS_TIMEOUT'       : 60 * 60 * 24,
+}
+
+# 썸네일 변환본 (가로 폭 기준, WebP/JPEG 로 저장)
+IMAGE_VARIANTS = {
+    'WIDTHS' : {
+        'card'   : 400,
+        'detail' : 800,
+        'retina' : 1600,
+    },
+    'QUALITY': 82,
+    'WORKERS': 2,
+}
+
+# 인증된 사용자를 워커마다 짧게 보관한다
+USER_CACHE = {
+    'MAXSIZE': 1024,
+    'TIMEOUT': 60,
+}
 
 
 # Password validation
@@ -90,6 +159,13 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# bcrypt 비용과 동시에 해싱할 스레드 수
+PASSWORD_HASHING = {
+    'ROUNDS' : 12,
+    'WORKERS': 2,
+}
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/3.1/topics/i18n/
 
@@ -129,6 +205,7 @@ CORS_ALLOW_HEADERS = (
     'authorization',
     'content-type',
     'dnt',
+    'idempotency-key',
     'origin',
     'user-agent',
     'x-csrftoken',
@@ -143,3 +220,74 @@ EMAIL_HOST=my_settings.EMAIL['EMAIL_HOST']
 EMAIL_HOST_USER=my_settings.EMAIL['EMAIL_HOST_USER']
 EMAIL_HOST_PASSWORD=my_settings.EMAIL['EMAIL_HOST_PASSWORD']
 SERVER_EMAIL=my_settings.EMAIL['SERVER_EMAIL']
+
+# 후원 집계에서 제외할 주문 상태
+ORDER_CANCELED_STATUSES = ['canceled', 'refunded']
+
+# 후원(pledge) 으로 새로 만든 주문의 상태
+ORDER_PLACED_STATUS = 'pledged'
+
+# 메일 큐 (send_queued_emails 워커)
+EMAIL_QUEUE = {
+    'BATCH_SIZE'   : 50,
+    'MAX_ATTEMPTS' : 5,
+    'RETRY_BACKOFF': 30,
+    'CLAIM_TIMEOUT': 300,
+}
+
+# 요청 제한 (토큰 버킷: 키 종류별 (용량, 초)) / BACKEND: cache | memory
+RATE_LIMITS = {
+    'BACKEND'    : 'cache',
+    'CACHE_ALIAS': 'default',
+    'ENDPOINTS'  : {
+        'send_mail'    : {'ip': (10, 3600), 'email': (3, 600)},
+        'sign_in'      : {'ip': (30, 60), 'email': (10, 300)},
+        'validate_code': {'ip': (30, 60), 'email': (10, 600)},
+    },
+}
+
+# 이메일 인증번호 저장소 (STORE: database | cache), TIMEOUT 초 뒤 만료
+VERIFICATION = {
+    'STORE'      : 'database',
+    'CACHE_ALIAS': 'default',
+    'TIMEOUT'    : 60,
+}
+
+# 소셜 로그인 (프로바이더 CLASS 를 user.oauth.FakeProvider 로 바꾸면 네트워크 없이 동작한다)
+OAUTH = {
+    'CONNECT_TIMEOUT': 3.05,
+    'READ_TIMEOUT'   : 5,
+    'POOL_MAXSIZE'   : 10,
+    'CACHE_ALIAS'    : 'default',
+    'PROFILE_TIMEOUT': 60,
+    'PROVIDERS'      : {
+        'kakao': {'CLASS': 'user.oauth.KakaoProvider'},
+    },
+}
+
+# ASGI 서버(uvicorn 등)로 띄울 때 카카오 로그인을 async 뷰로 연결한다 (외부 API 를 기다리는 동안 이벤트 루프를 놓아 준다)
+# 프로필 조회만 실행기 스레드로 나가고, sign_in_social_user 의 ORM 작업은 thread_sensitive 인 단일 스레드 하나에서 차례로 돈다
+ASYNC_VIEWS = os.environ.get('ASYNC_VIEWS', '0') == '1'
+
+# Idempotency-Key 헤더로 들어온 POST 의 응답을 idempotency_keys 테이블에 TIMEOUT 초 동안 저장해 재시도에 그대로 돌려준다
+# 지난 키는 purge_idempotency_keys 명령으로 지운다
+IDEMPOTENCY = {
+    'TIMEOUT'     : 60 * 60 * 24,
+    'LOCK_TIMEOUT': 30,
+}
+
+# Category, Status 같은 코드 테이블의 프로세스 내 캐시 (CHECK_INTERVAL 초마다 CACHE_ALIAS 의 버전을 확인)
+# 버전은 공유 캐시에서만 워커끼리 전해지므로 MAX_AGE 초가 지나면 버전과 상관없이 다시 읽는다
+LOOKUP_TABLES = {
+    'CACHE_ALIAS'   : 'default',
+    'CHECK_INTERVAL': 5,
+    'MAX_AGE'       : 60,
+}
+
+# 프로젝트 검색 (BACKEND: fulltext 는 MySQL FULLTEXT ngram 인덱스, index 는 project_search_terms 역색인)
+# NGRAM_SIZE 는 MySQL 의 ngram_token_size 와 같아야 한다
+PROJECT_SEARCH = {
+    'BACKEND'     : 'fulltext' if DATABASES['default']['ENGINE'].endswith('mysql') else 'index',
+    'NGRAM_SIZE'  : 2,
+    'TITLE_WEIGHT': 3,
+}
@@ -3,4 +3,5 @@ from django.urls import path, include
 urlpatterns = [
     path('user', include('user.urls')),
     path('project', include('project.urls')),
+    path('order', include('order.urls')),
 ]
\ No newline at end of file
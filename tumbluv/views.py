@@ -0,0 +1,22 @@
+import asyncio
+
+from functools               import update_wrapper
+
+from django.utils.decorators import classonlymethod
+from django.views            import View
+
+class AsyncView(View):
+    # Django 3.1 의 View.as_view() 는 동기 함수라서 ASGI 에서도 스레드로 실행된다.
+    # 코루틴 함수로 감싸서 핸들러가 이벤트 루프에서 바로 await 하게 한다.
+    @classonlymethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+
+        async def async_view(request, *args, **kwargs):
+            response = view(request, *args, **kwargs)
+            if asyncio.iscoroutine(response):
+                response = await response
+            return response
+
+        update_wrapper(async_view, view)
+        return async_view
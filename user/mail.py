@@ -0,0 +1,79 @@
+import smtplib
+import datetime
+
+from django.conf      import settings
+from django.core.mail import EmailMessage
+from django.db        import transaction
+from django.db.models import F
+from django.utils     import timezone
+
+from .models          import OutgoingEmail
+
+def enqueue_email(subject, body, to):
+    return OutgoingEmail.objects.create(subject=subject, body=body, to=to)
+
+def get_retry_delay(attempts):
+    return datetime.timedelta(seconds=settings.EMAIL_QUEUE['RETRY_BACKOFF'] * 2 ** (attempts - 1))
+
+def claim_queued_emails(batch_size):
+    now = timezone.now()
+
+    # 잠금은 집어 오는 동안만 잡고 SENDING 으로 바꿔 커밋한다. 잠긴 행은 다른 워커가 건너뛴다.
+    # 보내는 도중 워커가 죽으면 CLAIM_TIMEOUT 뒤에 다른 워커가 다시 집어 간다.
+    # 시도 횟수는 집을 때 올려서, 워커를 죽이는 메일도 MAX_ATTEMPTS 번 뒤에는 FAILED 로 빠진다.
+    with transaction.atomic():
+        emails = list(
+            OutgoingEmail.objects.select_for_update(skip_locked=True).filter(
+                status__in=[OutgoingEmail.PENDING, OutgoingEmail.SENDING], next_attempt_at__lte=now
+            ).order_by('id')[:batch_size]
+        )
+
+        exhausted = [email.id for email in emails if email.attempts >= settings.EMAIL_QUEUE['MAX_ATTEMPTS']]
+        emails    = [email for email in emails if email.id not in exhausted]
+
+        OutgoingEmail.objects.filter(id__in=exhausted).update(status=OutgoingEmail.FAILED)
+        OutgoingEmail.objects.filter(id__in=[email.id for email in emails]).update(
+            status          = OutgoingEmail.SENDING,
+            attempts        = F('attempts') + 1,
+            next_attempt_at = now + datetime.timedelta(seconds=settings.EMAIL_QUEUE['CLAIM_TIMEOUT'])
+        )
+
+    for email in emails:
+        email.attempts += 1
+
+    return emails
+
+def close_connection(connection):
+    try:
+        connection.close()
+    except (smtplib.SMTPException, OSError):
+        pass
+
+def send_queued_email(connection, email):
+    message = EmailMessage(email.subject, email.body, to=[email.to], connection=connection)
+
+    try:
+        # 끊겼던 연결은 여기서 다시 열고, 열리지 않으면 이 메일의 실패로 기록한다
+        connection.open()
+        connection.send_messages([message])
+        email.status  = OutgoingEmail.SENT
+        email.sent_at = timezone.now()
+
+    # SMTP 오류가 아니어도 (잘못된 헤더 등) 이 메일의 실패로 기록해서 SENDING 에 남지 않게 한다
+    except Exception as error:
+        email.last_error      = str(error)[:1000]
+        email.next_attempt_at = timezone.now() + get_retry_delay(email.attempts)
+        email.status          = (
+            OutgoingEmail.FAILED if email.attempts >= settings.EMAIL_QUEUE['MAX_ATTEMPTS'] else OutgoingEmail.PENDING
+        )
+        close_connection(connection)
+
+    email.save(update_fields=['status', 'attempts', 'last_error', 'next_attempt_at', 'sent_at'])
+
+def send_queued_emails(connection, batch_size):
+    emails = claim_queued_emails(batch_size)
+
+    for email in emails:
+        send_queued_email(connection, email)
+
+    return len(emails)
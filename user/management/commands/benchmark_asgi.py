@@ -0,0 +1,108 @@
+import time
+import asyncio
+
+from concurrent.futures          import ThreadPoolExecutor
+from wsgiref.util                import setup_testing_defaults
+
+from django.conf                 import settings
+from django.core.handlers.asgi   import ASGIHandler
+from django.core.handlers.wsgi   import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils           import override_settings
+from django.urls                 import path
+
+from user.views                  import KakaoSignInView, AsyncKakaoSignInView
+
+# 같은 로그인 뷰의 동기/비동기 버전을 나란히 띄우는 벤치마크 전용 urlconf
+urlpatterns = [
+    path('wsgi', KakaoSignInView.as_view()),
+    path('asgi', AsyncKakaoSignInView.as_view()),
+]
+
+class Command(BaseCommand):
+    help = 'Compare WSGI and ASGI throughput of Kakao sign-in against a fake provider with upstream latency'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--threads', type=int, default=4)
+        parser.add_argument('--concurrency', type=int, default=50)
+        parser.add_argument('--delay', type=float, default=0.05)
+
+    def get_oauth_settings(self, count, delay):
+        profile = {'email': 'benchmark@tumbluv.com', 'fullname': '벤치마크', 'profile_image': None}
+        return {
+            **settings.OAUTH,
+            'PROFILE_TIMEOUT': 0,
+            'PROVIDERS'      : {
+                'kakao': {
+                    'CLASS'  : 'user.oauth.FakeProvider',
+                    'OPTIONS': {'DELAY': delay, 'PROFILES': {f'token-{i}': profile for i in range(count)}},
+                },
+            },
+        }
+
+    def check_status(self, status):
+        if status != 200:
+            raise CommandError(f'sign-in returned {status}')
+
+    def run_wsgi(self, count, threads):
+        handler = WSGIHandler()
+
+        def request(i):
+            environ = {'REQUEST_METHOD': 'GET', 'PATH_INFO': '/wsgi', 'HTTP_AUTHORIZATION': f'token-{i}'}
+            setup_testing_defaults(environ)
+            response = handler(environ, lambda status, headers: None)
+            b''.join(response)
+            response.close()
+            self.check_status(response.status_code)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(threads) as executor:
+            list(executor.map(request, range(count)))
+        return count / (time.perf_counter() - start)
+
+    async def run_asgi(self, count, concurrency):
+        handler   = ASGIHandler()
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                self.check_status(message['status'])
+
+        async def request(i):
+            scope = {
+                'type'        : 'http',
+                'asgi'        : {'version': '3.0'},
+                'http_version': '1.1',
+                'method'      : 'GET',
+                'scheme'      : 'http',
+                'path'        : '/asgi',
+                'raw_path'    : b'/asgi',
+                'root_path'   : '',
+                'query_string': b'',
+                'headers'     : [(b'host', b'testserver'), (b'authorization', f'token-{i}'.encode())],
+                'client'      : ('127.0.0.1', 0),
+                'server'      : ('testserver', 80),
+            }
+            async with semaphore:
+                await handler(scope, receive, send)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(request(i) for i in range(count)))
+        return count / (time.perf_counter() - start)
+
+    def handle(self, *args, **options):
+        count = options['requests']
+
+        with override_settings(ROOT_URLCONF=__name__, OAUTH=self.get_oauth_settings(count, options['delay'])):
+            self.run_wsgi(1, 1)
+
+            wsgi = self.run_wsgi(count, options['threads'])
+            asgi = asyncio.run(self.run_asgi(count, options['concurrency']))
+
+        self.stdout.write(f'upstream delay {options["delay"] * 1000:.0f}ms, {count} requests')
+        self.stdout.write(f'WSGI {options["threads"]:>3} threads    {wsgi:8.1f} req/s')
+        self.stdout.write(f'ASGI {options["concurrency"]:>3} concurrent {asgi:8.1f} req/s')
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from tumbluv.idempotency         import purge_idempotency_keys
+
+class Command(BaseCommand):
+    help = 'Delete expired idempotency keys from the idempotency_keys table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        deleted = purge_idempotency_keys(options['batch_size'])
+        self.stdout.write(f'{deleted} expired idempotency keys deleted')
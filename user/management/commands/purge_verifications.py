@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from user.verification           import get_store
+
+class Command(BaseCommand):
+    help = 'Delete expired verification codes from the verifications table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        deleted = get_store().purge(options['batch_size'])
+        self.stdout.write(f'{deleted} expired verifications deleted')
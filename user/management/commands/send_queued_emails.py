@@ -0,0 +1,38 @@
+import time
+
+from django.conf                 import settings
+from django.core.mail            import get_connection
+from django.core.management.base import BaseCommand
+
+from user.mail                   import close_connection, send_queued_emails
+
+class Command(BaseCommand):
+    help = 'Send pending emails from the outgoing_emails queue over one SMTP connection'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=settings.EMAIL_QUEUE['BATCH_SIZE'])
+        parser.add_argument('--loop', action='store_true')
+        parser.add_argument('--interval', type=float, default=1.0)
+
+    def handle(self, *args, **options):
+        connection = get_connection()
+        total      = 0
+
+        try:
+            while True:
+                sent   = send_queued_emails(connection, options['batch_size'])
+                total += sent
+
+                if sent:
+                    continue
+
+                if not options['loop']:
+                    break
+
+                # 큐가 비어 있는 동안에는 연결을 닫아 SMTP 서버의 idle timeout 을 피한다
+                close_connection(connection)
+                time.sleep(options['interval'])
+        finally:
+            close_connection(connection)
+
+        self.stdout.write(f'{total} emails processed')
@@ -0,0 +1,32 @@
+# Generated by Django 3.1.6 on 2026-10-18 16:36
+
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def delete_duplicate_verifications(apps, schema_editor):
+    Verification = apps.get_model('user', 'Verification')
+    objects      = Verification.objects.using(schema_editor.connection.alias)
+    latest_ids   = objects.values('email').annotate(latest_id=Max('id')).values('latest_id')
+    objects.exclude(id__in=list(latest_ids)).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0005_outgoing_email'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_duplicate_verifications, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='verification',
+            name='created_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='verification',
+            name='email',
+            field=models.CharField(max_length=200, unique=True),
+        ),
+    ]
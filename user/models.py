@@ -1,4 +1,5 @@
-from django.db import models
+from django.db    import models
+from django.utils import timezone
 
 class User(models.Model):
     fullname         = models.CharField(max_length=40)
@@ -13,8 +14,46 @@ class User(models.Model):
 
 class Verification(models.Model):
     code       = models.CharField(max_length=6)
-    email      = models.CharField(max_length=200)
-    created_at = models.DateTimeField(auto_now=True)
+    email      = models.CharField(max_length=200, unique=True)
+    created_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         db_table = 'verifications'
+
+class OutgoingEmail(models.Model):
+    PENDING = 'pending'
+    SENDING = 'sending'
+    SENT    = 'sent'
+    FAILED  = 'failed'
+
+    subject         = models.CharField(max_length=200)
+    body            = models.TextField()
+    to              = models.CharField(max_length=200)
+    status          = models.CharField(max_length=20, default=PENDING)
+    attempts        = models.IntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error      = models.CharField(max_length=1000, null=True)
+    created_at      = models.DateTimeField(auto_now_add=True)
+    sent_at         = models.DateTimeField(null=True)
+
+    class Meta:
+        db_table = 'outgoing_emails'
+        indexes  = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outgoing_emails_due_idx'),
+        ]
+
+class IdempotencyKey(models.Model):
+    # status_code 가 비어 있으면 아직 처리 중인 요청이다
+    user         = models.ForeignKey('User', on_delete=models.CASCADE)
+    key          = models.CharField(max_length=64)
+    fingerprint  = models.CharField(max_length=64)
+    status_code  = models.IntegerField(null=True)
+    content      = models.BinaryField(null=True)
+    content_type = models.CharField(max_length=100, null=True)
+    created_at   = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        db_table    = 'idempotency_keys'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='idempotency_keys_user_key_unique'),
+        ]
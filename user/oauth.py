@@ -0,0 +1,160 @@
+import time
+import hashlib
+import requests
+
+from collections                 import namedtuple
+
+from asgiref.sync                import sync_to_async
+
+from django.conf                 import settings
+from django.core.cache           import caches
+from django.dispatch             import receiver
+from django.test.signals         import setting_changed
+from django.utils.module_loading import import_string
+from requests.adapters           import HTTPAdapter
+
+SocialProfile = namedtuple('SocialProfile', ['email', 'fullname', 'profile_image'])
+
+class OAuthError(Exception):
+    pass
+
+class OAuthUnavailable(Exception):
+    pass
+
+session = None
+
+def get_session():
+    # 프로바이더끼리 keep-alive 커넥션 풀을 공유한다
+    global session
+
+    if session is None:
+        adapter = HTTPAdapter(pool_maxsize=settings.OAUTH['POOL_MAXSIZE'])
+        session = requests.Session()
+        session.mount('https://', adapter)
+
+    return session
+
+class OAuthProvider:
+    name = None
+
+    def __init__(self, options):
+        self.options = options
+
+    def is_success(self, status_code):
+        # 만료·폐기된 토큰은 4xx 와 에러 본문으로 오므로 2xx 가 아니면 잘못된 토큰으로 본다
+        return 200 <= status_code < 300
+
+    def get_timeout(self):
+        return (settings.OAUTH['CONNECT_TIMEOUT'], settings.OAUTH['READ_TIMEOUT'])
+
+    def request(self, url, access_token):
+        try:
+            response = get_session().get(
+                url, headers={'Authorization': f'Bearer {access_token}'}, timeout=self.get_timeout()
+            )
+            if not self.is_success(response.status_code):
+                raise OAuthError(self.name)
+            return response.json()
+        except requests.RequestException:
+            raise OAuthUnavailable(self.name)
+        except ValueError:
+            raise OAuthError(self.name)
+
+    async def request_async(self, url, access_token):
+        # 풀링된 requests 세션을 공유 스레드가 아닌 실행기 스레드에서 돌려 이벤트 루프를 막지 않는다
+        return await sync_to_async(self.request, thread_sensitive=False)(url, access_token)
+
+    def parse_profile(self, data):
+        raise NotImplementedError
+
+    def fetch_profile(self, access_token):
+        return self.parse_profile(self.request(self.PROFILE_URL, access_token))
+
+    async def fetch_profile_async(self, access_token):
+        return self.parse_profile(await self.request_async(self.PROFILE_URL, access_token))
+
+class KakaoProvider(OAuthProvider):
+    name        = 'kakao'
+    PROFILE_URL = 'https://kapi.kakao.com/v2/user/me'
+
+    def parse_profile(self, data):
+        try:
+            account = data['kakao_account']
+            profile = account['profile']
+
+            # 카카오가 인증한 유효한 이메일만 계정을 찾는 데 쓴다
+            verified = account.get('is_email_valid') is True and account.get('is_email_verified') is True
+
+            return SocialProfile(
+                email         = account.get('email') if verified else None,
+                fullname      = profile['nickname'],
+                profile_image = profile.get('profile_image_url'),
+            )
+        except (KeyError, TypeError):
+            raise OAuthError(self.name)
+
+class FakeProvider(OAuthProvider):
+    # 네트워크 없이 테스트할 때 OPTIONS['PROFILES'] 에 토큰별 프로필을 넣어 쓴다
+    name        = 'fake'
+    PROFILE_URL = None
+
+    # OPTIONS['DELAY'] 초만큼 업스트림 지연을 request() 안에서 흉내 내서 (부하 테스트용)
+    # 비동기 뷰도 실제 프로바이더처럼 request_async 의 실행기 스레드를 거친다
+    def request(self, url, access_token):
+        time.sleep(self.options.get('DELAY', 0))
+        try:
+            return self.options['PROFILES'][access_token]
+        except KeyError:
+            raise OAuthError(self.name)
+
+    def parse_profile(self, data):
+        return SocialProfile(**data)
+
+providers = {}
+
+def get_provider(name):
+    if name not in providers:
+        config          = settings.OAUTH['PROVIDERS'][name]
+        providers[name] = import_string(config['CLASS'])(config.get('OPTIONS', {}))
+
+    return providers[name]
+
+@receiver(setting_changed)
+def oauth_changed(setting, **kwargs):
+    global session
+
+    if setting == 'OAUTH':
+        providers.clear()
+        session = None
+
+def get_profile_cache_key(provider, access_token):
+    # 토큰 원문 대신 지문만 캐시 키로 남긴다
+    fingerprint = hashlib.sha256(access_token.encode('utf-8')).hexdigest()
+    return f'oauth:{provider}:{fingerprint}'
+
+def get_profile_cache():
+    return caches[settings.OAUTH['CACHE_ALIAS']]
+
+def get_profile(provider, access_token):
+    cache   = get_profile_cache()
+    key     = get_profile_cache_key(provider, access_token)
+    profile = cache.get(key)
+
+    if profile is None:
+        profile = get_provider(provider).fetch_profile(access_token)
+        cache.set(key, tuple(profile), settings.OAUTH['PROFILE_TIMEOUT'])
+        return profile
+
+    return SocialProfile(*profile)
+
+async def get_profile_async(provider, access_token):
+    cache   = get_profile_cache()
+    key     = get_profile_cache_key(provider, access_token)
+    profile = await sync_to_async(cache.get)(key)
+
+    if profile is None:
+        profile = await get_provider(provider).fetch_profile_async(access_token)
+        await sync_to_async(cache.set)(key, tuple(profile), settings.OAUTH['PROFILE_TIMEOUT'])
+        return profile
+
+    return SocialProfile(*profile)
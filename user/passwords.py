@@ -0,0 +1,47 @@
+import bcrypt
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf        import settings
+
+executor_lock = threading.Lock()
+executor      = None
+
+def get_executor():
+    # bcrypt 는 해싱 중 GIL 을 놓으므로 스레드 풀로 동시에 도는 bcrypt 개수를 제한한다
+    global executor
+
+    if executor is None:
+        with executor_lock:
+            if executor is None:
+                executor = ThreadPoolExecutor(
+                    max_workers        = settings.PASSWORD_HASHING['WORKERS'],
+                    thread_name_prefix = 'bcrypt'
+                )
+
+    return executor
+
+def get_rounds(hashed_password):
+    try:
+        return int(hashed_password.split('$')[2])
+    except (IndexError, ValueError):
+        return None
+
+def hash_password(password):
+    rounds = settings.PASSWORD_HASHING['ROUNDS']
+
+    return get_executor().submit(
+        lambda: bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+    ).result()
+
+def check_password(password, hashed_password):
+    if not hashed_password:
+        return False
+
+    return get_executor().submit(
+        lambda: bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
+    ).result()
+
+def needs_rehash(hashed_password):
+    return get_rounds(hashed_password) != settings.PASSWORD_HASHING['ROUNDS']
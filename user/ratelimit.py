@@ -0,0 +1,143 @@
+import json
+import math
+import time
+import threading
+
+from functools            import wraps
+
+from django.conf          import settings
+from django.core.cache    import caches
+from django.dispatch      import receiver
+from django.http          import JsonResponse
+from django.test.signals  import setting_changed
+
+class TokenBucket:
+    def __init__(self, capacity, per):
+        self.capacity = capacity
+        self.rate     = capacity / per
+
+    def refill(self, state, now):
+        if state is None:
+            return self.capacity
+        tokens, updated_at = state
+        return min(self.capacity, tokens + (now - updated_at) * self.rate)
+
+    def retry_after(self, tokens):
+        return (1 - tokens) / self.rate
+
+class MemoryBackend:
+    # 프로세스 안에서만 공유된다 (워커마다 따로 센다)
+    SWEEP_INTERVAL = 60
+
+    def __init__(self):
+        self.buckets  = {}
+        self.full_at  = {}
+        self.swept_at = time.monotonic()
+        self.lock     = threading.Lock()
+
+    def save(self, key, bucket, tokens, now):
+        self.buckets[key] = (tokens, now)
+        self.full_at[key] = now + (bucket.capacity - tokens) / bucket.rate
+
+    def sweep(self, now):
+        # 다시 가득 찬 버킷은 처음 보는 키와 같으므로 버린다.
+        # IP 나 이메일을 바꿔 가며 요청해도 최근 키만 남아 메모리가 계속 늘지 않는다
+        if now - self.swept_at < self.SWEEP_INTERVAL:
+            return
+
+        for key in [key for key, full_at in self.full_at.items() if full_at <= now]:
+            del self.buckets[key], self.full_at[key]
+
+        self.swept_at = now
+
+    def consume(self, key, bucket):
+        with self.lock:
+            now    = time.monotonic()
+            tokens = bucket.refill(self.buckets.get(key), now)
+            self.sweep(now)
+
+            if tokens < 1:
+                self.save(key, bucket, tokens, now)
+                return bucket.retry_after(tokens)
+
+            self.save(key, bucket, tokens - 1, now)
+            return 0
+
+class CacheBackend:
+    # 캐시(redis)를 통해 워커끼리 공유한다. get/set 사이의 경합으로 동시 요청 몇 개가
+    # 더 통과할 수는 있지만, 남용 차단 용도로는 충분하다
+    def __init__(self, alias):
+        self.cache = caches[alias]
+
+    def consume(self, key, bucket):
+        now     = time.time()
+        tokens  = bucket.refill(self.cache.get(key), now)
+        timeout = math.ceil(bucket.capacity / bucket.rate)
+
+        if tokens < 1:
+            self.cache.set(key, (tokens, now), timeout)
+            return bucket.retry_after(tokens)
+
+        self.cache.set(key, (tokens - 1, now), timeout)
+        return 0
+
+backend = None
+
+def get_backend():
+    global backend
+
+    if backend is None:
+        config  = settings.RATE_LIMITS
+        backend = MemoryBackend() if config['BACKEND'] == 'memory' else CacheBackend(config['CACHE_ALIAS'])
+
+    return backend
+
+def reset_backend():
+    global backend
+    backend = None
+
+@receiver(setting_changed)
+def rate_limits_changed(setting, **kwargs):
+    if setting == 'RATE_LIMITS':
+        reset_backend()
+
+def get_client_ip(request):
+    return request.META.get('REMOTE_ADDR')
+
+def get_email(request):
+    try:
+        email = json.loads(request.body).get('email')
+    except (ValueError, AttributeError):
+        return None
+
+    return email.strip().lower() if isinstance(email, str) else None
+
+KEY_FUNCTIONS = {
+    'ip'   : get_client_ip,
+    'email': get_email,
+}
+
+def ratelimit(name):
+    def decorator(func):
+        @wraps(func)
+        def wrapper(request, *args, **kwargs):
+            limits      = settings.RATE_LIMITS['ENDPOINTS'].get(name, {})
+            retry_after = 0
+
+            for kind, (capacity, per) in limits.items():
+                value = KEY_FUNCTIONS[kind](request)
+
+                if value is None:
+                    continue
+
+                wait        = get_backend().consume(f'ratelimit:{name}:{kind}:{value}', TokenBucket(capacity, per))
+                retry_after = max(retry_after, wait)
+
+            if retry_after:
+                response                = JsonResponse({'message': 'TOO_MANY_REQUESTS'}, status=429)
+                response['Retry-After'] = str(math.ceil(retry_after))
+                return response
+
+            return func(request, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -4,31 +4,53 @@ import jwt
 import time
 import datetime
 import bcrypt
+import requests
 
+from io                     import StringIO
 from random                 import randint
+from smtplib                import SMTPException
 
+from django.conf            import settings
 from django.http            import JsonResponse
 from django.views           import View
-from django.test            import TestCase, Client
+from django.test            import TestCase, Client, RequestFactory, AsyncRequestFactory
 from unittest.mock          import patch, MagicMock
+from asgiref.sync           import async_to_sync
 from django.core.exceptions import ValidationError
 from django.core.validators import validate_email
+from django.core            import mail
+from django.core.cache      import cache
 from django.core.mail       import EmailMessage
-
-from .models                import User, Verification
+from django.core.management import call_command
+from django.utils           import timezone
+
+from .models                import User, Verification, OutgoingEmail
+from .mail                  import enqueue_email
+from .ratelimit             import TokenBucket, MemoryBackend, CacheBackend
+from .verification          import DatabaseStore
+from .oauth                 import KakaoProvider, get_session
+from .views                 import AsyncKakaoSignInView
 from .views                 import KakaoSignInView
+from .utils                 import login_decorator, user_decorator, user_cache
 from my_settings            import ALGORITHM, SECRET_KEY, EMAIL
 
 class KakaoSignInTest(TestCase):
-    @patch('user.views.requests')
+    def setUp(self):
+        cache.clear()
+
+    @patch('user.oauth.get_session')
     def test_kakao_login_success(self, mocked_request):
 
         class KakaoResponse:
+            status_code = 200
+
             def json(self):
                 return {
                     "kakao_account": {
-                        "email"   : "danbi@so.cute",
-                        "profile" : {
+                        "email"             : "danbi@so.cute",
+                        "is_email_valid"    : True,
+                        "is_email_verified" : True,
+                        "profile"           : {
                             "nickname" : "단비"
                         }
                     }
@@ -36,7 +58,7 @@ class KakaoSignInTest(TestCase):
                 }
             
         client             = Client()
-        mocked_request.get = MagicMock(return_value=KakaoResponse())
+        mocked_request.return_value.get = MagicMock(return_value=KakaoResponse())
         header             = {'HTTP_Authorization': 'access_token'}
         response           = client.get('/user/signin/kakao', content_type='application/json', **header)
         user_id            = User.objects.get(email = 'danbi@so.cute').id
@@ -53,10 +75,12 @@ class KakaoSignInTest(TestCase):
             }
         )
 
-    @patch('user.views.requests')
+    @patch('user.oauth.get_session')
     def test_kakao_login_failed_invalid_token(self, mocked_request):
 
         class KakaoResponse:
+            status_code = 401
+
             def json(self):
                 return {
                     "code": -401,
@@ -64,7 +88,7 @@ class KakaoSignInTest(TestCase):
                 }
 
         client             = Client()
-        mocked_request.get = MagicMock(return_value=KakaoResponse())
+        mocked_request.return_value.get = MagicMock(return_value=KakaoResponse())
         header             = {'HTTP_Authorization': '12345' }
         response           = client.get('/user/signin/kakao', content_type='application/json', **header)
 
@@ -379,3 +403,476 @@ class SendMailTest(TestCase):
                 'message':'INVALID_EMAIL'
             }
         )
+
+class LoginDecoratorTest(TestCase):
+
+    class ProfileView(View):
+        @login_decorator
+        def get(self, request):
+            return JsonResponse({'id': request.user.id, 'fullname': request.user.fullname})
+
+    class UserIdView(View):
+        @user_decorator
+        def get(self, request):
+            return JsonResponse({'id': request.user.id})
+
+    class WriteView(View):
+        @login_decorator
+        def post(self, request):
+            return JsonResponse({'id': request.user.id})
+
+    def setUp(self):
+        user_cache.clear()
+        User.objects.create(id=1, fullname='김코드', email='wecode1@gmail.com')
+
+    def tearDown(self):
+        User.objects.all().delete()
+
+    def request(self):
+        access_token = jwt.encode({'id': 1}, SECRET_KEY, algorithm=ALGORITHM)
+        request      = RequestFactory().get('/user/profile', HTTP_Authorization=access_token)
+        return self.ProfileView.as_view()(request)
+
+    def test_login_decorator_caches_user(self):
+        with self.assertNumQueries(1):
+            self.request()
+
+        with self.assertNumQueries(0):
+            response = self.request()
+
+        self.assertEqual(json.loads(response.content), {'id': 1, 'fullname': '김코드'})
+
+    def test_user_decorator_loads_user_only_for_other_fields(self):
+        access_token = jwt.encode({'id': 1}, SECRET_KEY, algorithm=ALGORITHM)
+        request      = RequestFactory().get('/user/id', HTTP_Authorization=access_token)
+
+        with self.assertNumQueries(0):
+            response = self.UserIdView.as_view()(request)
+
+        self.assertEqual(json.loads(response.content), {'id': 1})
+
+    def test_login_decorator_checks_user_before_view(self):
+        access_token = jwt.encode({'id': 1}, SECRET_KEY, algorithm=ALGORITHM)
+        request      = RequestFactory().post('/user/id', HTTP_Authorization=access_token)
+
+        with self.assertNumQueries(1):
+            self.WriteView.as_view()(request)
+
+        # 캐시에 있으면 다시 조회하지 않는다
+        with self.assertNumQueries(0):
+            response = self.WriteView.as_view()(request)
+        self.assertEqual(json.loads(response.content), {'id': 1})
+
+        User.objects.filter(id=1).delete()
+        response = self.WriteView.as_view()(request)
+
+        self.assertEqual((response.status_code, json.loads(response.content)), (401, {'message': 'INVALID_USER'}))
+
+    def test_login_decorator_cache_invalidated_on_save_and_delete(self):
+        self.request()
+
+        user          = User.objects.get(id=1)
+        user.fullname = '박코드'
+        user.save()
+        self.assertEqual(json.loads(self.request().content)['fullname'], '박코드')
+
+        user.delete()
+        self.assertEqual(json.loads(self.request().content), {'message': 'INVALID_USER'})
+
+class PasswordHashingTest(TestCase):
+
+    def setUp(self):
+        User.objects.create(
+            email    = 'test1234@test.com',
+            password = bcrypt.hashpw('123456'.encode('utf-8'), bcrypt.gensalt(4)).decode()
+        )
+
+    def tearDown(self):
+        User.objects.all().delete()
+
+    @patch('user.passwords.bcrypt.hashpw')
+    def test_signup_rejects_before_hashing(self, mocked_hashpw):
+        for user in [
+            {'fullname': '김', 'email': 'wecode3@gmail.com', 'password': '12345678'},
+            {'fullname': '허코드', 'email': 'wecode4@gmail.com', 'password': '12345'},
+            {'fullname': '박코드', 'email': 'test1234@test.com', 'password': '12345678'},
+        ]:
+            response = self.client.post('/user/signup', json.dumps(user), content_type='application/json')
+            self.assertEqual(response.status_code, 400)
+
+        mocked_hashpw.assert_not_called()
+
+    def test_signin_rehashes_when_rounds_change(self):
+        user = {'email': 'test1234@test.com', 'password': '123456'}
+
+        with self.settings(PASSWORD_HASHING={**settings.PASSWORD_HASHING, 'ROUNDS': 5}):
+            response = self.client.post('/user/signin', json.dumps(user), content_type='application/json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(User.objects.get(email='test1234@test.com').password.startswith('$2b$05$'))
+
+class EmailQueueTest(TestCase):
+    def setUp(self):
+        mail.outbox = []
+
+    def test_send_mail_view_only_enqueues(self):
+        client   = Client()
+        response = client.post('/user/signup/email', json.dumps({'email': 'queue@gmail.com'}), content_type='application/json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(mail.outbox, [])
+
+        email = OutgoingEmail.objects.get(to='queue@gmail.com')
+        self.assertEqual(email.status, OutgoingEmail.PENDING)
+        self.assertIn(str(Verification.objects.get(email='queue@gmail.com').code), email.body)
+
+    def test_worker_sends_batch_over_one_connection(self):
+        for i in range(3):
+            enqueue_email('title', 'body', f'user{i}@gmail.com')
+
+        with patch('user.management.commands.send_queued_emails.get_connection', wraps=mail.get_connection) as mocked_connection:
+            call_command('send_queued_emails', batch_size=2, stdout=StringIO())
+
+        self.assertEqual(mocked_connection.call_count, 1)
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), ['user0@gmail.com', 'user1@gmail.com', 'user2@gmail.com'])
+        self.assertFalse(OutgoingEmail.objects.exclude(status=OutgoingEmail.SENT).exists())
+
+    def test_worker_retries_with_backoff(self):
+        email = enqueue_email('title', 'body', 'retry@gmail.com')
+
+        with patch('django.core.mail.backends.locmem.EmailBackend.send_messages', side_effect=SMTPException('down')):
+            call_command('send_queued_emails', stdout=StringIO())
+
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutgoingEmail.PENDING)
+        self.assertEqual(email.attempts, 1)
+        self.assertEqual(email.last_error, 'down')
+        self.assertGreater(email.next_attempt_at, timezone.now())
+
+        call_command('send_queued_emails', stdout=StringIO())
+        self.assertEqual(mail.outbox, [])
+
+        OutgoingEmail.objects.filter(id=email.id).update(next_attempt_at=timezone.now())
+        call_command('send_queued_emails', stdout=StringIO())
+
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutgoingEmail.SENT)
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_worker_gives_up_after_max_attempts(self):
+        email = enqueue_email('title', 'body', 'fail@gmail.com')
+        OutgoingEmail.objects.filter(id=email.id).update(attempts=settings.EMAIL_QUEUE['MAX_ATTEMPTS'] - 1)
+
+        with patch('django.core.mail.backends.locmem.EmailBackend.send_messages', side_effect=SMTPException('down')):
+            call_command('send_queued_emails', stdout=StringIO())
+
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutgoingEmail.FAILED)
+
+    def test_worker_records_connection_failures_per_email(self):
+        emails = [enqueue_email('title', 'body', f'down{i}@gmail.com') for i in range(2)]
+
+        with patch('django.core.mail.backends.locmem.EmailBackend.open', side_effect=ConnectionRefusedError('refused')):
+            call_command('send_queued_emails', stdout=StringIO())
+
+        for email in emails:
+            email.refresh_from_db()
+            self.assertEqual((email.status, email.attempts, email.last_error), (OutgoingEmail.PENDING, 1, 'refused'))
+            self.assertGreater(email.next_attempt_at, timezone.now())
+
+        self.assertEqual(mail.outbox, [])
+
+    def test_worker_records_unexpected_errors(self):
+        email = enqueue_email('title', 'body', 'poison@gmail.com')
+
+        with patch('django.core.mail.backends.locmem.EmailBackend.send_messages', side_effect=ValueError('bad header')):
+            call_command('send_queued_emails', stdout=StringIO())
+
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts, email.last_error), (OutgoingEmail.PENDING, 1, 'bad header'))
+
+    def test_worker_fails_emails_abandoned_too_often(self):
+        email = enqueue_email('title', 'body', 'crash@gmail.com')
+
+        for attempt in range(settings.EMAIL_QUEUE['MAX_ATTEMPTS']):
+            # 보내는 도중 워커가 죽어서 SENDING 으로 남은 것처럼 만든다
+            with patch('user.mail.send_queued_email'):
+                call_command('send_queued_emails', stdout=StringIO())
+            OutgoingEmail.objects.filter(id=email.id).update(next_attempt_at=timezone.now())
+
+        call_command('send_queued_emails', stdout=StringIO())
+
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), (OutgoingEmail.FAILED, settings.EMAIL_QUEUE['MAX_ATTEMPTS']))
+        self.assertEqual(mail.outbox, [])
+
+    def test_worker_reclaims_abandoned_emails(self):
+        claimed   = enqueue_email('title', 'body', 'claimed@gmail.com')
+        abandoned = enqueue_email('title', 'body', 'abandoned@gmail.com')
+
+        OutgoingEmail.objects.filter(id=claimed.id).update(
+            status=OutgoingEmail.SENDING, next_attempt_at=timezone.now() + datetime.timedelta(minutes=5)
+        )
+        OutgoingEmail.objects.filter(id=abandoned.id).update(
+            status=OutgoingEmail.SENDING, next_attempt_at=timezone.now() - datetime.timedelta(seconds=1)
+        )
+
+        call_command('send_queued_emails', stdout=StringIO())
+
+        self.assertEqual([message.to[0] for message in mail.outbox], ['abandoned@gmail.com'])
+        self.assertEqual(OutgoingEmail.objects.get(id=claimed.id).status, OutgoingEmail.SENDING)
+
+class RateLimitTest(TestCase):
+    RATE_LIMITS = {
+        'BACKEND'    : 'memory',
+        'CACHE_ALIAS': 'default',
+        'ENDPOINTS'  : {
+            'send_mail': {'ip': (3, 60), 'email': (2, 60)},
+            'sign_in'  : {'ip': (2, 60)},
+        },
+    }
+
+    def send_mail(self, email, ip='10.0.0.1'):
+        return self.client.post('/user/signup/email', json.dumps({'email': email}), content_type='application/json', REMOTE_ADDR=ip)
+
+    def test_rate_limit_by_email(self):
+        with self.settings(RATE_LIMITS=self.RATE_LIMITS):
+            self.assertEqual(self.send_mail('limit@gmail.com').status_code, 200)
+            self.assertEqual(self.send_mail('Limit@gmail.com', ip='10.0.0.2').status_code, 200)
+
+            response = self.send_mail('limit@gmail.com', ip='10.0.0.3')
+
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.json(), {'message': 'TOO_MANY_REQUESTS'})
+        self.assertEqual(response['Retry-After'], '30')
+        self.assertEqual(OutgoingEmail.objects.count(), 2)
+
+    def test_rate_limit_by_ip(self):
+        with self.settings(RATE_LIMITS=self.RATE_LIMITS):
+            for i in range(3):
+                self.assertEqual(self.send_mail(f'user{i}@gmail.com').status_code, 200)
+
+            self.assertEqual(self.send_mail('user3@gmail.com').status_code, 429)
+            self.assertEqual(self.send_mail('user3@gmail.com', ip='10.0.0.2').status_code, 200)
+
+    def test_sign_in_rate_limit_skips_password_check(self):
+        with self.settings(RATE_LIMITS=self.RATE_LIMITS):
+            for _ in range(2):
+                self.client.post('/user/signin', json.dumps({'email': 'a@gmail.com', 'password': '12345678'}), content_type='application/json')
+
+            with patch('user.views.check_password') as mocked_check:
+                response = self.client.post('/user/signin', json.dumps({'email': 'a@gmail.com', 'password': '12345678'}), content_type='application/json')
+
+        self.assertEqual(response.status_code, 429)
+        self.assertFalse(mocked_check.called)
+
+    def test_bucket_refills_over_time(self):
+        backend = MemoryBackend()
+        bucket  = TokenBucket(2, 60)
+
+        with patch('user.ratelimit.time.monotonic', return_value=100.0):
+            self.assertEqual(backend.consume('key', bucket), 0)
+            self.assertEqual(backend.consume('key', bucket), 0)
+            self.assertEqual(backend.consume('key', bucket), 30)
+
+        with patch('user.ratelimit.time.monotonic', return_value=130.0):
+            self.assertEqual(backend.consume('key', bucket), 0)
+
+    def test_memory_backend_drops_refilled_buckets(self):
+        bucket = TokenBucket(2, 60)
+
+        with patch('user.ratelimit.time.monotonic', return_value=100.0):
+            backend = MemoryBackend()
+            for i in range(100):
+                backend.consume(f'ip-{i}', bucket)
+            self.assertEqual(len(backend.buckets), 100)
+
+        # 한 번 쓴 버킷은 30 초 뒤에 다 차서 버려지고, 아직 차지 않은 버킷은 남는다
+        with patch('user.ratelimit.time.monotonic', return_value=100.0 + backend.SWEEP_INTERVAL):
+            backend.consume('limited', bucket)
+            backend.consume('limited', bucket)
+
+        self.assertEqual(set(backend.buckets), {'limited'})
+
+    def test_cache_backend_shares_buckets(self):
+        bucket = TokenBucket(1, 60)
+        self.assertEqual(CacheBackend('default').consume('ratelimit:test:shared', bucket), 0)
+        self.assertGreater(CacheBackend('default').consume('ratelimit:test:shared', bucket), 0)
+
+class VerificationStoreTest(TestCase):
+    def send_mail(self, email):
+        return self.client.post('/user/signup/email', json.dumps({'email': email}), content_type='application/json')
+
+    def validate(self, email, code):
+        return self.client.post('/user/signup/email-validation', json.dumps({'email': email, 'code': code}), content_type='application/json')
+
+    def test_issue_is_single_upsert(self):
+        store = DatabaseStore(60)
+
+        with self.assertNumQueries(1):
+            store.issue('store@gmail.com', '111111')
+        with self.assertNumQueries(1):
+            store.issue('store@gmail.com', '222222')
+
+        self.assertEqual(list(Verification.objects.values_list('email', 'code')), [('store@gmail.com', '222222')])
+        self.assertEqual(store.get('store@gmail.com'), '222222')
+
+    def test_expired_code_times_out_and_is_purged(self):
+        DatabaseStore(60).issue('old@gmail.com', '111111')
+        DatabaseStore(60).issue('new@gmail.com', '222222')
+        Verification.objects.filter(email='old@gmail.com').update(created_at=timezone.now() - datetime.timedelta(seconds=61))
+
+        self.assertEqual(self.validate('old@gmail.com', '111111').json(), {'message': 'TIME_OUT'})
+
+        out = StringIO()
+        call_command('purge_verifications', batch_size=1, stdout=out)
+
+        self.assertEqual(out.getvalue().strip(), '1 expired verifications deleted')
+        self.assertEqual(list(Verification.objects.values_list('email', flat=True)), ['new@gmail.com'])
+
+    def test_missing_code_times_out(self):
+        self.assertEqual(self.validate('none@gmail.com', '111111').json(), {'message': 'TIME_OUT'})
+
+    def test_cache_store_round_trip(self):
+        with self.settings(VERIFICATION={**settings.VERIFICATION, 'STORE': 'cache'}):
+            self.send_mail('cache@gmail.com')
+            code = OutgoingEmail.objects.get(to='cache@gmail.com').body.split(': ')[1]
+
+            self.assertEqual(self.validate('cache@gmail.com', '000000').json(), {'message': 'INVALID_CODE'})
+            self.assertEqual(self.validate('cache@gmail.com', code).json(), {'message': 'EMAIL_VALIDATE_SUCCESS'})
+            self.assertEqual(self.validate('cache@gmail.com', code).json(), {'message': 'TIME_OUT'})
+
+        self.assertFalse(Verification.objects.exists())
+
+class OAuthProviderTest(TestCase):
+    OAUTH = {
+        **settings.OAUTH,
+        'PROVIDERS': {
+            'kakao': {
+                'CLASS'  : 'user.oauth.FakeProvider',
+                'OPTIONS': {
+                    'PROFILES': {
+                        'fake-token' : {'email': 'fake@gmail.com', 'fullname': '가짜', 'profile_image': 'https://image.png'},
+                        'no-email'   : {'email': None, 'fullname': '가짜', 'profile_image': None},
+                    },
+                },
+            },
+        },
+    }
+
+    VERIFIED = {'is_email_valid': True, 'is_email_verified': True}
+
+    def setUp(self):
+        cache.clear()
+
+    def sign_in(self, token):
+        return self.client.get('/user/signin/kakao', HTTP_Authorization=token)
+
+    def test_fake_provider_sign_in(self):
+        with self.settings(OAUTH=self.OAUTH):
+            response = self.sign_in('fake-token')
+            self.assertEqual(self.sign_in('unknown').json(), {'message': 'TOKEN_INVALID'})
+            self.assertEqual(self.sign_in('no-email').status_code, 405)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['data'], {'profile_image': 'https://image.png', 'name': '가짜'})
+
+    def test_existing_user_is_reused_when_nickname_changes(self):
+        User.objects.create(email='fake@gmail.com', fullname='원래이름')
+
+        with self.settings(OAUTH=self.OAUTH):
+            response = self.sign_in('fake-token')
+
+        self.assertEqual(response.json()['data']['name'], '원래이름')
+        self.assertEqual(User.objects.filter(email='fake@gmail.com').count(), 1)
+
+    def test_password_account_is_not_linked(self):
+        User.objects.create(email='fake@gmail.com', fullname='원래이름', password='hashed')
+
+        with self.settings(OAUTH=self.OAUTH):
+            response = self.sign_in('fake-token')
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json(), {'message': 'ALREADY_EXIST'})
+
+    @patch('user.oauth.get_session')
+    def test_kakao_unverified_email_is_not_used(self, mocked_session):
+        User.objects.create(email='victim@gmail.com', fullname='피해자')
+        mocked_session.return_value.get.return_value.status_code = 200
+
+        for flags in [{'is_email_valid': True, 'is_email_verified': False}, {'is_email_valid': False, 'is_email_verified': True}, {}]:
+            cache.clear()
+            mocked_session.return_value.get.return_value.json.return_value = {
+                'kakao_account': {**flags, 'email': 'victim@gmail.com', 'profile': {'nickname': '공격자'}}
+            }
+
+            response = self.sign_in('attacker-token')
+            self.assertEqual(response.status_code, 405)
+            self.assertEqual(response.json(), {'message': 'EMAIL_REQUIRED'})
+
+    @patch('user.oauth.get_session')
+    def test_kakao_error_status_is_invalid_token(self, mocked_session):
+        mocked_session.return_value.get.return_value.status_code = 401
+        mocked_session.return_value.get.return_value.json.return_value = {
+            'kakao_account': {**self.VERIFIED, 'email': 'expired@gmail.com', 'profile': {'nickname': '만료'}}
+        }
+
+        response = self.sign_in('expired-token')
+
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json(), {'message': 'TOKEN_INVALID'})
+        self.assertFalse(User.objects.filter(email='expired@gmail.com').exists())
+
+    @patch('user.oauth.get_session')
+    def test_kakao_profile_cached_by_token_fingerprint(self, mocked_session):
+        mocked_session.return_value.get.return_value.status_code = 200
+        mocked_session.return_value.get.return_value.json.return_value = {
+            'kakao_account': {**self.VERIFIED, 'email': 'cached@gmail.com', 'profile': {'nickname': '캐시', 'profile_image_url': 'https://kakao.png'}}
+        }
+
+        self.assertEqual(self.sign_in('kakao-token').status_code, 200)
+        self.assertEqual(self.sign_in('kakao-token').status_code, 200)
+
+        mocked_session.return_value.get.assert_called_once_with(
+            KakaoProvider.PROFILE_URL,
+            headers = {'Authorization': 'Bearer kakao-token'},
+            timeout = (settings.OAUTH['CONNECT_TIMEOUT'], settings.OAUTH['READ_TIMEOUT'])
+        )
+        self.assertEqual(User.objects.get(email='cached@gmail.com').profile_image, 'https://kakao.png')
+        self.assertIsNone(cache.get('oauth:kakao:kakao-token'))
+
+    @patch('user.oauth.get_session')
+    def test_kakao_timeout_returns_503(self, mocked_session):
+        mocked_session.return_value.get.side_effect = requests.Timeout
+
+        response = self.sign_in('slow-token')
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json(), {'message': 'OAUTH_UNAVAILABLE'})
+
+    def test_session_is_shared(self):
+        self.assertIs(get_session(), get_session())
+
+    def sign_in_async(self, token):
+        request = AsyncRequestFactory().get('/user/signin/kakao', authorization=token)
+        return async_to_sync(AsyncKakaoSignInView.as_view())(request)
+
+    def test_async_fake_provider_sign_in(self):
+        with self.settings(OAUTH=self.OAUTH):
+            response = self.sign_in_async('fake-token')
+            self.assertEqual(json.loads(self.sign_in_async('unknown').content), {'message': 'TOKEN_INVALID'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)['data'], {'profile_image': 'https://image.png', 'name': '가짜'})
+
+    @patch('user.oauth.get_session')
+    def test_async_kakao_uses_pooled_session(self, mocked_session):
+        mocked_session.return_value.get.return_value.status_code = 200
+        mocked_session.return_value.get.return_value.json.return_value = {
+            'kakao_account': {**self.VERIFIED, 'email': 'async@gmail.com', 'profile': {'nickname': '비동기'}}
+        }
+
+        response = self.sign_in_async('async-token')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(User.objects.filter(email='async@gmail.com').exists())
@@ -1,11 +1,16 @@
+from django.conf    import settings
 from django.urls    import path
 
-from user.views     import ValidateCodeView, KakaoSignInView, SignInView, SendMailView, SignUpView
+from user.views     import ValidateCodeView, KakaoSignInView, SignInView, SendMailView, SignUpView, AsyncKakaoSignInView
+from user.ratelimit import ratelimit
+
+if settings.ASYNC_VIEWS:
+    KakaoSignInView = AsyncKakaoSignInView
 
 urlpatterns = [
-    path('/signup/email-validation', ValidateCodeView.as_view()),
+    path('/signup/email-validation', ratelimit('validate_code')(ValidateCodeView.as_view())),
     path('/signin/kakao', KakaoSignInView.as_view()),
-    path('/signin', SignInView.as_view()),
+    path('/signin', ratelimit('sign_in')(SignInView.as_view())),
     path('/signup', SignUpView.as_view()),
-    path('/signup/email', SendMailView.as_view()),
+    path('/signup/email', ratelimit('send_mail')(SendMailView.as_view())),
 ]
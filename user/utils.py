@@ -1,20 +1,95 @@
 import jwt
 import json
+import time
+import threading
 
+from collections          import OrderedDict
+
+from django.conf          import settings
 from django.http          import JsonResponse
 
 from .models              import User
 from my_settings          import SECRET_KEY, ALGORITHM
 
+class UserCache:
+    def __init__(self, maxsize, timeout):
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self.users   = OrderedDict()
+        self.lock    = threading.Lock()
+
+    def get(self, user_id):
+        with self.lock:
+            entry = self.users.get(user_id)
+
+            if entry is None:
+                return None
+
+            user, expires_at = entry
+
+            if expires_at < time.monotonic():
+                del self.users[user_id]
+                return None
+
+            self.users.move_to_end(user_id)
+            return user
+
+    def set(self, user):
+        with self.lock:
+            self.users[user.id] = (user, time.monotonic() + self.timeout)
+            self.users.move_to_end(user.id)
+
+            while len(self.users) > self.maxsize:
+                self.users.popitem(last=False)
+
+    def delete(self, user_id):
+        with self.lock:
+            self.users.pop(user_id, None)
+
+    def clear(self):
+        with self.lock:
+            self.users.clear()
+
+user_cache = UserCache(settings.USER_CACHE['MAXSIZE'], settings.USER_CACHE['TIMEOUT'])
+
+def get_user(user_id):
+    user = user_cache.get(user_id)
+
+    if user is None:
+        user = User.objects.get(id=user_id)
+        user_cache.set(user)
+
+    return user
+
+class LazyUser:
+    # id 외의 속성에 처음 접근할 때 캐시된 User 의 복사본을 가져온다
+    def __init__(self, user_id):
+        self.id    = user_id
+        self._user = None
+
+    def load(self):
+        if self._user is None:
+            user        = get_user(self.id)
+            field_names = [field.attname for field in User._meta.concrete_fields]
+            self._user  = User.from_db(user._state.db, field_names, [getattr(user, name) for name in field_names])
+        return self
+
+    def __getattr__(self, name):
+        return getattr(self.load()._user, name)
+
+def authenticate(access_token, lazy=False):
+    # lazy 면 사용자 조회를 뷰가 id 외의 필드를 읽을 때까지 미룬다 (없는 사용자는 그때 INVALID_USER).
+    # 쓰기 뷰는 request.user.id 만 읽고 FK 로 저장하므로 미리 확인해야 지워진 사용자가 500 이나 엉뚱한 오류가 되지 않는다
+    payload = jwt.decode(access_token, SECRET_KEY, ALGORITHM)
+    user    = LazyUser(payload['id'])
+    return user if lazy else user.load()
+
 def login_decorator(func):
     def wrapper(self, request, *args, **kwargs):
         if 'Authorization' not in request.headers:
             return JsonResponse({'message': 'NEED_LOGIN'}, status=401)
         try:
-            access_token = request.headers['Authorization']
-            payload      = jwt.decode(access_token, SECRET_KEY, ALGORITHM)
-            login_user   = User.objects.get(id=payload['id'])
-            request.user = login_user
+            request.user = authenticate(request.headers['Authorization'])
             return func(self, request, *args, **kwargs)
         except jwt.DecodeError:
             return JsonResponse({'message': 'INVALID_TOKEN'}, status=401)
@@ -28,13 +103,10 @@ def user_decorator(func):
             request.user = None
             return func(self, request, *args, **kwargs)
         try:
-            access_token = request.headers['Authorization']
-            payload      = jwt.decode(access_token, SECRET_KEY, ALGORITHM)
-            login_user   = User.objects.get(id=payload['id'])
-            request.user = login_user
+            request.user = authenticate(request.headers['Authorization'], lazy=True)
             return func(self, request, *args, **kwargs)
         except jwt.DecodeError:
             return JsonResponse({'message': 'INVALID_TOKEN'}, status=401)
         except User.DoesNotExist:
             return JsonResponse({'message': 'INVALID_USER'}, status=401)
-    return wrapper
\ No newline at end of file
+    return wrapper
@@ -0,0 +1,103 @@
+import datetime
+
+from django.conf          import settings
+from django.core.cache    import caches
+from django.db            import connection
+from django.dispatch      import receiver
+from django.test.signals  import setting_changed
+from django.utils         import timezone
+
+from .models              import Verification
+
+UPSERT_SQL = {
+    'mysql'     : (
+        'INSERT INTO verifications (email, code, created_at) VALUES (%s, %s, %s) '
+        'ON DUPLICATE KEY UPDATE code = VALUES(code), created_at = VALUES(created_at)'
+    ),
+    'sqlite'    : (
+        'INSERT INTO verifications (email, code, created_at) VALUES (%s, %s, %s) '
+        'ON CONFLICT (email) DO UPDATE SET code = excluded.code, created_at = excluded.created_at'
+    ),
+}
+UPSERT_SQL['postgresql'] = UPSERT_SQL['sqlite']
+
+class DatabaseStore:
+    def __init__(self, timeout):
+        self.timeout = timeout
+
+    def get_cutoff(self):
+        return timezone.now() - datetime.timedelta(seconds=self.timeout)
+
+    def issue(self, email, code):
+        sql = UPSERT_SQL.get(connection.vendor)
+
+        if sql is None:
+            Verification.objects.update_or_create(email=email, defaults={'code': code})
+            return
+
+        created_at = connection.ops.adapt_datetimefield_value(timezone.now())
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [email, code, created_at])
+
+    def get(self, email):
+        return Verification.objects.filter(
+            email=email, created_at__gt=self.get_cutoff()
+        ).values_list('code', flat=True).first()
+
+    def delete(self, email):
+        Verification.objects.filter(email=email).delete()
+
+    def purge(self, batch_size):
+        expired = Verification.objects.filter(created_at__lte=self.get_cutoff())
+        total   = 0
+
+        # 한 번에 지우면 테이블 락이 길어지므로 나눠서 지운다
+        while True:
+            ids = list(expired.values_list('id', flat=True)[:batch_size])
+            if not ids:
+                return total
+            total += Verification.objects.filter(id__in=ids).delete()[0]
+
+class CacheStore:
+    def __init__(self, timeout, alias):
+        self.timeout = timeout
+        self.cache   = caches[alias]
+
+    def get_key(self, email):
+        return f'verification:{email}'
+
+    def issue(self, email, code):
+        self.cache.set(self.get_key(email), code, self.timeout)
+
+    def get(self, email):
+        return self.cache.get(self.get_key(email))
+
+    def delete(self, email):
+        self.cache.delete(self.get_key(email))
+
+    def purge(self, batch_size):
+        # 캐시가 TTL 로 알아서 지운다
+        return 0
+
+store = None
+
+def get_store():
+    global store
+
+    if store is None:
+        config = settings.VERIFICATION
+        store  = (
+            CacheStore(config['TIMEOUT'], config['CACHE_ALIAS'])
+            if config['STORE'] == 'cache' else DatabaseStore(config['TIMEOUT'])
+        )
+
+    return store
+
+def reset_store():
+    global store
+    store = None
+
+@receiver(setting_changed)
+def verification_changed(setting, **kwargs):
+    if setting == 'VERIFICATION':
+        reset_store()
@@ -1,52 +1,74 @@
-import requests
 import json
-import bcrypt
 import jwt
 import datetime
 
 from random                         import randint
 
+from asgiref.sync                   import sync_to_async
+
 from django.http                    import JsonResponse
 from django.views                   import View
-from django.utils                   import timezone
+from django.utils.crypto            import constant_time_compare
 from django.core.exceptions         import ValidationError
 from django.core.validators         import validate_email
-from django.core.mail               import EmailMessage
 
-from .models                        import User, Verification
+from tumbluv.views                  import AsyncView
+
+from .models                        import User
+from .mail                          import enqueue_email
+from .oauth                         import OAuthError, OAuthUnavailable, get_profile, get_profile_async
+from .passwords                     import hash_password, check_password, needs_rehash
+from .verification                  import get_store
 from my_settings                    import (
     KAKAO_KEY, ALGORITHM, SECRET_KEY, EMAIL
 )
 
+def sign_in_social_user(profile):
+    if not profile.email:
+        return JsonResponse({'message': 'EMAIL_REQUIRED'}, status = 405)
+
+    user, created = User.objects.get_or_create(
+        email    = profile.email,
+        defaults = {
+            'profile_image' : profile.profile_image,
+            'fullname'      : profile.fullname
+        }
+    )
+
+    # 이메일·비밀번호로 가입한 계정은 소셜 로그인에 연결하지 않는다
+    if not created and user.password is not None:
+        return JsonResponse({'message': 'ALREADY_EXIST'}, status = 409)
+
+    access_token = jwt.encode({'id': user.id}, SECRET_KEY, algorithm=ALGORITHM)
+    result = {
+        'profile_image' : user.profile_image,
+        'name'          : user.fullname
+        }
+
+    return JsonResponse({'message': 'SUCCESS', 'data': result, 'access_token': access_token}, status = 200)
+
 class KakaoSignInView(View):
     def get(self, request):
         try:
-            access_token = request.headers['Authorization']
-            url          = "https://kapi.kakao.com/v2/user/me"
-            header       = {
-                'Authorization' : 'Bearer {}'.format(access_token)
-            }
-            response     = requests.get(url, headers = header).json()
-                
-            if 'email' not in response['kakao_account']:
-                return JsonResponse({'message': 'EMAIL_REQUIRED'}, status = 405)
+            profile = get_profile('kakao', request.headers['Authorization'])
+            return sign_in_social_user(profile)
 
-            user, is_user = User.objects.get_or_create(
-                email         = response['kakao_account']['email'], 
-                profile_image = response.get('kakao_account''profile''profile_image_url', None),
-                fullname      = response['kakao_account']['profile']['nickname']
-            )
+        except (KeyError, OAuthError):
+            return JsonResponse({'message': 'TOKEN_INVALID'}, status=401)
+        except OAuthUnavailable:
+            return JsonResponse({'message': 'OAUTH_UNAVAILABLE'}, status=503)
 
-            access_token = jwt.encode({'id': user.id}, SECRET_KEY, algorithm=ALGORITHM)
-            result = {
-                'profile_image' : user.profile_image,
-                'name'          : user.fullname
-                }
-            
-            return JsonResponse({'message': 'SUCCESS', 'data': result, 'access_token': access_token}, status = 200)
+class AsyncKakaoSignInView(AsyncView):
+    async def get(self, request):
+        try:
+            profile = await get_profile_async('kakao', request.headers['Authorization'])
+            # ORM 을 쓰는 가입/로그인은 여전히 thread_sensitive 인 단일 스레드에서 차례로 돈다
+            return await sync_to_async(sign_in_social_user)(profile)
 
-        except:
+        except (KeyError, OAuthError):
             return JsonResponse({'message': 'TOKEN_INVALID'}, status=401)
+        except OAuthUnavailable:
+            return JsonResponse({'message': 'OAUTH_UNAVAILABLE'}, status=503)
 
 class SendMailView(View):
     def post(self, request):
@@ -58,15 +80,8 @@ class SendMailView(View):
 
             validate_email(email)
 
-            if Verification.objects.filter(email=email).exists():
-                trier      = Verification.objects.get(email=email)
-                trier.code = code
-                trier.save()          
-            else:
-                trier = Verification.objects.create(email=email, code=code)
-
-            email      = EmailMessage(MAIL_TITLE, '인증번호: ' + str(trier.code), to=[email])
-            email.send()
+            get_store().issue(email, str(code))
+            enqueue_email(MAIL_TITLE, '인증번호: ' + str(code), email)
 
             return JsonResponse({'message': 'SUCCESS'}, status=200)
 
@@ -77,21 +92,19 @@ class SendMailView(View):
 
 class ValidateCodeView(View):
     def post(self, request):
-        TIME_LIMIT = 60
-
         data = json.loads(request.body)
         try:
-            code  = data['code']
-            email = data['email']
-            trier = Verification.objects.get(email=email)
+            code   = data['code']
+            email  = data['email']
+            store  = get_store()
+            issued = store.get(email)
 
-            if (timezone.now() - trier.created_at).seconds >= TIME_LIMIT:
-                trier.delete()
+            if issued is None:
                 return JsonResponse({'message': 'TIME_OUT'}, status=400)
 
-            if code != trier.code:
+            if not constant_time_compare(str(code), issued):
                 return JsonResponse({'message': 'INVALID_CODE'}, status=400)
-            trier.delete()
+            store.delete(email)
             return JsonResponse({'message': 'EMAIL_VALIDATE_SUCCESS'}, status=200)
                 
         except KeyError:
@@ -108,21 +121,20 @@ class SignUpView(View):
             fullname        = data['fullname']
             email           = data['email']
             password        = data['password']
-            hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
-
-            if User.objects.filter(email=email).exists():
-                return JsonResponse({'message': 'ALREADY_EXIST'}, status=400)
 
             if (len(fullname) < MINIMUM_FULLNAME_LENGTH) or (len(fullname) > MAXIMUM_FULLNAME_LENGTH):
                 return JsonResponse({'message': 'FULLNAME_VALIDATION_ERROR'}, status=400)
                 
             if (len(password) < MINIMUM_PASSWORD_LENGTH) or (len(password) > MAXIMUM_PASSWORD_LENGTH):
                 return JsonResponse({'message': 'PASSWORD_VALIDATION_ERROR'}, status=400)
+
+            if User.objects.filter(email=email).exists():
+                return JsonResponse({'message': 'ALREADY_EXIST'}, status=400)
             
             user = User.objects.create(
                 email    = email,
                 fullname = fullname,
-                password = hashed_password
+                password = hash_password(password)
             )
 
             return JsonResponse({'message': 'SUCCESS'}, status=200)
@@ -137,13 +149,13 @@ class SignInView(View):
         try:
             email    = data['email']
             password = data['password']
+            user     = User.objects.get(email=email)
 
-            if not User.objects.filter(email=email).exists():
-                return JsonResponse({'message': 'INVALID_USER'}, status=401)
+            if check_password(password, user.password):
+                if needs_rehash(user.password):
+                    user.password = hash_password(password)
+                    user.save(update_fields=['password'])
 
-            user = User.objects.get(email=email)
-
-            if bcrypt.checkpw(password.encode('utf-8'), user.password.encode('utf-8')):
                 access_token = jwt.encode({'id': user.id}, SECRET_KEY, algorithm=ALGORITHM)
 
                 return JsonResponse({'message': 'SUCCESS', 'access_token': access_token}, status=200)
@@ -151,3 +163,6 @@ class SignInView(View):
 
         except KeyError:
             return JsonResponse({'message': 'INVALID_KEY'}, status=400)
+
+        except User.DoesNotExist:
+            return JsonResponse({'message': 'INVALID_USER'}, status=401)